@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+def synthetic_texts(count: int):
+    verbs = ["calculate", "summarize", "translate", "search", "convert", "analyze", "generate", "validate"]
+    nouns = ["invoices", "weather data", "stock prices", "emails", "source code", "recipes", "contracts", "logs"]
+    return [f"Skill {i}: {verbs[i % len(verbs)]} {nouns[(i // len(verbs)) % len(nouns)]} variant {i % 101}" for i in range(count)]
+
+def run_synthetic(count: int, queries: int):
+    """Index and search generated skills on a standalone store (use EMBEDDING_PROVIDER=local offline)."""
+    from src.core.vector_store import VectorStore
+
+    store = VectorStore()
+    texts = synthetic_texts(count)
+
+    start = time.perf_counter()
+    store.upsert_many([str(i) for i in range(count)], texts)
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts[:queries]:
+        store.search(text, top_k=5)
+    search_ms = (time.perf_counter() - start) * 1000 / max(1, min(queries, count))
+
+    print(json.dumps({
+        "provider": store.model,
+        "skills": count,
+        "index_type": store.index_type,
+        "index_seconds": round(index_seconds, 3),
+        "search_ms_mean": round(search_ms, 3),
+    }))
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vector index backends against the exact flat baseline.")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--sample-size", type=int, default=100)
+    parser.add_argument("--types", nargs="*", default=None, help="Subset of: flat hnsw ivfpq")
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark N generated skills instead of the registry")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        store = run_synthetic(args.synthetic, args.sample_size)
+    else:
+        from src.core.vector_store import vector_store as store
+        from src.services.registry import registry_service
+        print(f"Skills indexed: {len(registry_service.list_skills().skills)} (active backend: {store.index_type})")
+
+    for row in store.recall_report(k=args.k, sample_size=args.sample_size, index_types=args.types):
+        print(json.dumps(row))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List, Optional
 from src.models import (
     Skill, 
     SkillRegistry,
+    SkillMatch,
+    BatchSearchResult,
     RegistrationBatch,
     BatchStatus,
     Judgment
@@ -11,8 +13,11 @@ from src.services.registration import registration_service
 from src.services.registry import registry_service
 from src.services.batch_store import batch_store_service
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from uuid import UUID
+import os
+
+MAX_BATCH_SEARCH_QUERIES = int(os.getenv("MAX_BATCH_SEARCH_QUERIES", "256"))
 
 class GitHubRegistrationRequest(BaseModel):
     repo_url: str
@@ -22,8 +27,21 @@ class JudgmentRequest(BaseModel):
     path: str
     judgment: Judgment
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: int = Field(1, ge=1, le=50)
+
 router = APIRouter(prefix="/skills", tags=["skills"])
 
+def search_filters(
+    complexity: Optional[str] = Query(None, description="SIMPLE or COMPLEX"),
+    version: Optional[str] = Query(None),
+    source: Optional[str] = Query(None, description="owner/repo for GitHub skills, else the source URL"),
+    tag: Optional[List[str]] = Query(None, description="Repeat to require several tags")
+) -> Dict[str, List[str]]:
+    filters = {"complexity": [complexity.upper()] if complexity else [], "version": [version] if version else [], "source": [source] if source else [], "tag": tag or []}
+    return {attribute: values for attribute, values in filters.items() if values}
+
 @router.get("/parse-github-url")
 async def parse_github_url(url: str = Query(..., description="GitHub URL to parse")):
     """Parse a GitHub URL to detect if it's a root repo or a deep link."""
@@ -134,6 +152,20 @@ async def sync_skill(skill_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sync failed: {str(e)}")
 
+@router.get("/search", response_model=List[SkillMatch])
+async def search_skills(q: str = Query(..., min_length=1), top_k: int = Query(5, ge=1, le=50), filters: Dict[str, List[str]] = Depends(search_filters)):
+    """Semantic skill search, optionally restricted by complexity, version, source repo and tags."""
+    from src.services.search import search_service
+    return await search_service.search(q, top_k=top_k, filters=filters)
+
+@router.post("/search:batch", response_model=List[BatchSearchResult])
+async def search_skills_batch(request: BatchSearchRequest, filters: Dict[str, List[str]] = Depends(search_filters)):
+    """Resolve many routing queries at once with a single batched vector search."""
+    if len(request.queries) > MAX_BATCH_SEARCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SEARCH_QUERIES} queries per batch")
+    from src.services.search import search_service
+    return await search_service.search_batch(request.queries, top_k=request.top_k, filters=filters)
+
 @router.get("", response_model=List[Skill])
 async def list_skills():
     registry = registry_service.list_skills()
@@ -155,5 +187,5 @@ async def get_skill_documentation(skill_id: str):
 
 @router.delete("/{skill_id}")
 async def delete_skill(skill_id: str):
-    registry_service.remove_skill(skill_id)
+    await registry_service.aremove_skill(skill_id)
     return {"message": "Skill deleted successfully"}
\ No newline at end of file
@@ -19,6 +19,16 @@ async def list_tools():
     service = ToolService()
     return await service.list_tools()
 
+@router.get("/cache/stats")
+async def tool_cache_stats():
+    """Hit/miss/coalescing counters of the per-tool result caches."""
+    return ToolService().cache_stats()
+
+@router.get("/breakers")
+async def tool_breakers():
+    """Circuit breaker state and concurrency of every tool that has been called."""
+    return ToolService().breaker_stats()
+
 @router.post("/local", status_code=201)
 async def register_local_tool(tool_data: Dict[str, Any], api_key: str = Depends(verify_api_key)):
     service = ToolService()
@@ -1,6 +1,8 @@
 import asyncio
+import json
+import os
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.agents import AgentAction, AgentFinish
@@ -8,6 +10,7 @@ from langchain_core.outputs import LLMResult
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from ..services.session_registry import session_registry
 from ..models.execution import ExecutionMessage, MessageRole
+from src.core.schema_validation import validation_errors
 
 class AgentExecutionCallbackHandler(BaseCallbackHandler):
     def __init__(self, session_id: UUID, websocket_manager: Any = None):
@@ -31,11 +34,60 @@ class AgentExecutionCallbackHandler(BaseCallbackHandler):
                 tool_call=tool_name
             )
 
+# One "Action: ... / Action Input: ..." pair; the input ends where the next block starts
+ACTION_PATTERN = re.compile(r"Action:\s*(.*?)\nAction Input:\s*(.*?)(?=\n(?:Thought|Action|Observation):|$)", re.DOTALL)
+
+def parse_actions(content: str) -> List[Tuple[str, str]]:
+    """All (tool name, tool input) pairs in an LLM turn, in the order they were written."""
+    return [(name.strip(), tool_input.strip()) for name, tool_input in ACTION_PATTERN.findall(content)]
+
+# Optional ```json fence some models wrap Action Input in
+FENCE_PATTERN = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+
+def parse_action_input(tool_input: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Action Input as tool arguments: a JSON object, or bare text for a tool with a single parameter."""
+    text = tool_input.strip()
+    fenced = FENCE_PATTERN.match(text)
+    if fenced:
+        text = fenced.group(1)
+    if not text:
+        return {}
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = text
+    if isinstance(value, dict):
+        return value
+    properties = list(schema.get("properties", {}))
+    required = schema.get("required", [])
+    single = required if len(required) == 1 else properties if len(properties) == 1 else []
+    if single:
+        return {single[0]: value}
+    raise ValueError(f"Action Input must be a JSON object with the arguments {properties}")
+
+def describe_args(tool: Any) -> str:
+    """Compact argument list for the prompt, e.g. ' Args: {"query": "string"}'."""
+    schema = getattr(getattr(tool, "tool_def", None), "input_schema", None)
+    properties = schema.get("properties") if isinstance(schema, dict) else None
+    if not properties:
+        return ""
+    args = {name: spec.get("type", "any") if isinstance(spec, dict) else "any" for name, spec in properties.items()}
+    return f" Args: {json.dumps(args)}"
+
+def is_parallel_capable(tool: Any) -> bool:
+    tool_def = getattr(tool, "tool_def", None)
+    return bool(getattr(tool_def, "parallel_capable", False))
+
 class InterruptibleAgentLoop:
-    def __init__(self, session_id: UUID, websocket_manager: Any = None):
+    def __init__(self, session_id: UUID, websocket_manager: Any = None, max_parallel_tools: Optional[int] = None):
         self.session_id = session_id
         self.websocket_manager = websocket_manager
         self.max_steps = 10
+        # Cap on concurrently running parallel_capable tools within this session
+        self.max_parallel_tools = max(1, max_parallel_tools or int(os.getenv("AGENT_MAX_PARALLEL_TOOLS", "4")))
+        self._tool_slots = asyncio.Semaphore(self.max_parallel_tools)
+        # Larger Action Inputs are rejected before parsing
+        self.max_input_chars = int(os.getenv("AGENT_MAX_ACTION_INPUT_CHARS", "20000"))
 
     async def run(self, llm: Any, tools: List[Any], prompt_template: str, input_text: str, mode: str = "HITL"):
         session = session_registry.get_session(self.session_id)
@@ -45,7 +97,7 @@ class InterruptibleAgentLoop:
         callbacks = AgentExecutionCallbackHandler(self.session_id, self.websocket_manager)
         
         # Prepare tools description
-        tools_str = "\n".join([f"{t.name}: {t.description}" for t in tools])
+        tools_str = "\n".join([f"{t.name}: {t.description}" + describe_args(t) + (" [parallel]" if is_parallel_capable(t) else "") for t in tools])
         tool_names = ", ".join([t.name for t in tools])
         
         # Build initial prompt
@@ -80,30 +132,25 @@ class InterruptibleAgentLoop:
             if final_answer_match:
                 return {"output": final_answer_match.group(1).strip()}
             
-            # Look for Thought and Action
+            # Look for Thought and Actions
             thought_match = re.search(r"Thought:\s*(.*?)(?=Action:|$)", content, re.DOTALL)
-            action_match = re.search(r"Action:\s*(.*?)\nAction Input:\s*(.*)", content, re.DOTALL)
+            actions = parse_actions(content)
             
             if thought_match:
                 thought = thought_match.group(1).strip()
                 await callbacks.on_thought(thought)
                 scratchpad += f"\nThought: {thought}"
             
-            if action_match:
-                tool_name = action_match.group(1).strip()
-                tool_input = action_match.group(2).strip()
-                
-                await callbacks.on_tool_start(tool_name, tool_input)
-                
-                # 3. Execute tool
-                tool = next((t for t in tools if t.name == tool_name), None)
-                if not tool:
-                    observation = f"Error: Tool {tool_name} not found."
-                else:
-                    try:
-                        from .tools import HumanInterrupt
-                        observation = await tool.ainvoke(tool_input)
-                    except HumanInterrupt as e:
+            if actions:
+                for tool_name, tool_input in actions:
+                    await callbacks.on_tool_start(tool_name, tool_input)
+
+                # 3. Execute tools; observations keep the order the actions were written in
+                from .tools import HumanInterrupt
+                outcomes = await self._execute_actions(actions, tools)
+                for (tool_name, tool_input), observation in zip(actions, outcomes):
+                    if isinstance(observation, HumanInterrupt):
+                        e = observation  # the tool asked for human input
                         if mode == "AUTONOMOUS":
                             error_msg = f"Ambiguity encountered in autonomous mode: {e.prompt}"
                             session_registry.update_session(self.session_id, status="FAILED")
@@ -120,10 +167,8 @@ class InterruptibleAgentLoop:
                         # We don't return here, we let the exception bubble up or handled by caller
                         # But since we're in a loop, we should stop this execution.
                         raise e
-                    except Exception as err:
-                        observation = f"Error: {str(err)}"
                 
-                scratchpad += f"\nAction: {tool_name}\nAction Input: {tool_input}\nObservation: {observation}"
+                    scratchpad += f"\nAction: {tool_name}\nAction Input: {tool_input}\nObservation: {observation}"
             else:
                 # If no action found but not final answer, LLM might be hallucinating format
                 # or just gave a final answer without the prefix.
@@ -133,4 +178,55 @@ class InterruptibleAgentLoop:
                         return {"output": content.strip()}
                     scratchpad += f"\n{content}"
             
-        return {"output": "Max steps reached without final answer."}
\ No newline at end of file
+        return {"output": "Max steps reached without final answer."}
+
+    async def _execute_actions(self, actions: List[Tuple[str, str]], tools: List[Any]) -> List[Any]:
+        """Run one step's actions and return an observation (or HumanInterrupt) per action, in order.
+
+        Consecutive parallel_capable tools run together, bounded by max_parallel_tools; any other
+        tool runs on its own, after everything before it. Nothing runs after a HumanInterrupt.
+        """
+        from .tools import HumanInterrupt
+        # First one wins on duplicate names, so RequestInputTool is never shadowed by a registry tool
+        tools_by_name: Dict[str, Any] = {}
+        for tool in tools:
+            tools_by_name.setdefault(tool.name, tool)
+        outcomes: List[Any] = []
+        index = 0
+        while index < len(actions):
+            group = [actions[index]]
+            if is_parallel_capable(tools_by_name.get(actions[index][0])):
+                while index + len(group) < len(actions) and is_parallel_capable(tools_by_name.get(actions[index + len(group)][0])):
+                    group.append(actions[index + len(group)])
+            results = await asyncio.gather(*(self._invoke(tools_by_name.get(name), name, tool_input) for name, tool_input in group))
+            outcomes.extend(results)
+            if any(isinstance(result, HumanInterrupt) for result in results):
+                break
+            index += len(group)
+        return outcomes
+
+    async def _invoke(self, tool: Any, tool_name: str, tool_input: str) -> Any:
+        from .tools import HumanInterrupt
+        if not tool:
+            return f"Error: Tool {tool_name} not found."
+        if len(tool_input) > self.max_input_chars:
+            return f"Error: Action Input for {tool_name} is {len(tool_input)} characters; the limit is {self.max_input_chars}."
+        schema = getattr(getattr(tool, "tool_def", None), "input_schema", None)
+        if isinstance(schema, dict):
+            # Registered tools get parsed, schema-checked arguments; bad input never reaches the tool
+            try:
+                tool_input = parse_action_input(tool_input, schema)
+            except ValueError as err:
+                return f"Error: {err}"
+            # Wrappers carry the validator compiled at registry load
+            validator = getattr(tool, "validator", None)
+            errors = validation_errors(validator, tool_input) if validator is not None else []
+            if errors:
+                return f"Error: Invalid Action Input for {tool_name}: " + "; ".join(errors)
+        try:
+            async with self._tool_slots:
+                return await tool.ainvoke(tool_input)
+        except HumanInterrupt as e:
+            return e
+        except Exception as err:
+            return f"Error: {str(err)}"
\ No newline at end of file
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Content-addressed on-disk cache of embedding vectors.
+
+    Entries are keyed by a hash of (model, task type, text), so a vector is only
+    ever recomputed when the text that produced it changes. Disk is the source of truth;
+    at most ``memory_entries`` recently used vectors are also kept in memory (0 disables).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, memory_entries: Optional[int] = None):
+        self.cache_dir = Path(cache_dir or os.getenv("EMBEDDING_CACHE_DIR", ".skill-executor-data/embeddings"))
+        # Raw vectors are large (12 KB at 3072 dims): the default LRU holds about 24 MB
+        self.memory_entries = memory_entries if memory_entries is not None else int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048"))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, task_type: str, text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, task_type, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        # Shard by prefix to keep directory listings small
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # Caller holds self._lock
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+        if vector is None:
+            path = self._path_for(key)
+            if path.exists():
+                try:
+                    vector = np.load(path)
+                except Exception as e:
+                    logger.warning(f"Discarding unreadable embedding cache entry {path}: {e}")
+                    path.unlink(missing_ok=True)
+                    vector = None
+                if vector is not None:
+                    with self._lock:
+                        self._remember(key, vector)
+
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so concurrent readers never see a partial entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to persist embedding cache entry {key}: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries_in_memory": len(self._memory),
+                "memory_entries": self.memory_entries,
+                "evictions": self.evictions,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+class QueryEmbeddingCache:
+    """Bounded in-memory LRU cache with TTL for query embeddings.
+
+    Queries are arbitrary user input, so they are kept in process memory only and
+    never written to the on-disk document cache.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size if max_size is not None else int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    make_key = staticmethod(EmbeddingCache.make_key)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, expires_at = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector: np.ndarray):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+# Global instances shared by every VectorStore
+embedding_cache = EmbeddingCache()
+query_embedding_cache = QueryEmbeddingCache()
@@ -0,0 +1,87 @@
+import hashlib
+import math
+import os
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List, Optional
+
+import google.generativeai as genai
+import numpy as np
+
+from src.core.lexical_index import tokenize
+
+class EmbeddingProvider(ABC):
+    """Turns texts into embedding vectors. ``model`` is part of every cache key."""
+    model: str
+    native_dimension: int
+
+    @abstractmethod
+    def embed(self, texts: List[str], task_type: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Return a (len(texts), native_dimension) float32 matrix. Raises on failure."""
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    native_dimension = 3072
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or os.getenv("EMBEDDING_MODEL", "models/gemini-embedding-001")
+        api_key = os.getenv("GOOGLE_API_KEY")
+        if api_key:
+            genai.configure(api_key=api_key)
+
+    def embed(self, texts: List[str], task_type: str, timeout: Optional[float] = None) -> np.ndarray:
+        kwargs = {"request_options": {"timeout": timeout}} if timeout else {}
+        result = genai.embed_content(
+            model=self.model,
+            content=texts,
+            task_type=task_type,
+            **kwargs
+        )
+        return np.array(result['embedding'], dtype=np.float32).reshape(len(texts), -1)
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """Deterministic offline embeddings: hashed word and character n-gram features.
+
+    Each feature is hashed to a signed bucket of a fixed-size vector (the hashing trick),
+    weighted by sublinear term frequency, and L2-normalized. No network, no model files,
+    and identical output across processes, which makes it usable in CI and load tests.
+    """
+
+    def __init__(self, dimension: Optional[int] = None, ngram_range: tuple = (3, 5)):
+        self.native_dimension = dimension or int(os.getenv("LOCAL_EMBEDDING_DIMENSION", "768"))
+        self.ngram_range = ngram_range
+        self.model = f"local-hashed-ngrams-v1-{self.native_dimension}"
+
+    def _features(self, text: str) -> Counter:
+        features: Counter = Counter()
+        for token in tokenize(text):
+            features[f"w:{token}"] += 1
+            padded = f"<{token}>"
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    features[f"c:{padded[i:i + n]}"] += 1
+        return features
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.native_dimension, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.native_dimension
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed(self, texts: List[str], task_type: str, timeout: Optional[float] = None) -> np.ndarray:
+        # Documents and queries share one space; task_type only matters for remote models
+        if not texts:
+            return np.zeros((0, self.native_dimension), dtype=np.float32)
+        return np.stack([self._embed_one(text) for text in texts])
+
+def get_embedding_provider(name: Optional[str] = None) -> EmbeddingProvider:
+    """Select the provider from EMBEDDING_PROVIDER (gemini | local)."""
+    name = (name or os.getenv("EMBEDDING_PROVIDER", "gemini")).lower()
+    if name == "gemini":
+        return GeminiEmbeddingProvider()
+    if name == "local":
+        return LocalEmbeddingProvider()
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {name}")
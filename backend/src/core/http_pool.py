@@ -0,0 +1,85 @@
+import importlib.util
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 is opt-in per tool and needs the "h2" package, which is not a declared dependency
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+def build_timeout(config: Any, default: float) -> httpx.Timeout:
+    """httpx.Timeout from a tools.json "timeout": a number or {"connect", "read", "write", "pool"}."""
+    if isinstance(config, dict):
+        return httpx.Timeout(config.get("default", default), **{key: config[key] for key in ("connect", "read", "write", "pool") if key in config})
+    return httpx.Timeout(config if config is not None else default)
+
+class HTTPClientPool:
+    """Process-wide keep-alive ``httpx.AsyncClient`` instances for network-bound tools.
+
+    A tool's ``config.http`` block in tools.json (timeout, max_connections,
+    max_keepalive_connections, keepalive_expiry, http2) selects a client; tools with the
+    same settings share one. Connection limits apply per client, across every host it
+    talks to: they are not per-host limits, so tools that need separate limits for
+    different APIs should use distinct ``http`` blocks.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None, max_keepalive_connections: Optional[int] = None, keepalive_expiry: Optional[float] = None, timeout: Optional[float] = None):
+        self.max_connections = max_connections or int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+        self.max_keepalive_connections = max_keepalive_connections or int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.keepalive_expiry = keepalive_expiry or float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+        self.timeout = timeout or float(os.getenv("HTTP_TIMEOUT_SECONDS", "20"))
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def client(self, config: Optional[Dict[str, Any]] = None) -> httpx.AsyncClient:
+        config = config or {}
+        key = json.dumps(config, sort_keys=True, default=str)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            http2 = bool(config.get("http2", False))
+            if http2 and not HTTP2_AVAILABLE:
+                logger.warning("HTTP/2 requested but the h2 package is not installed (pip install httpx[http2]); using HTTP/1.1")
+                http2 = False
+            limits = httpx.Limits(
+                max_connections=config.get("max_connections", self.max_connections),
+                max_keepalive_connections=config.get("max_keepalive_connections", self.max_keepalive_connections),
+                keepalive_expiry=config.get("keepalive_expiry", self.keepalive_expiry)
+            )
+            client = httpx.AsyncClient(
+                limits=limits,
+                timeout=build_timeout(config.get("timeout"), self.timeout),
+                http2=http2
+            )
+            self._clients[key] = client
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        return {"clients": sum(not client.is_closed for client in self._clients.values()), "http2": HTTP2_AVAILABLE}
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client: {e}")
+
+@dataclass
+class ToolContext:
+    """Passed to local tool entrypoints that accept a second ``context`` argument."""
+    tool_name: str
+    config: Dict[str, Any]
+    http_pool: "HTTPClientPool"
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Shared client configured by the tool's ``config.http`` block."""
+        return self.http_pool.client(self.config.get("http"))
+
+# Global instance shared by all local tools
+http_pool = HTTPClientPool()
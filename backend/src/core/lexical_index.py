@@ -0,0 +1,101 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Tuple
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Standard reciprocal-rank-fusion damping constant
+RRF_K = 60
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+class LexicalIndex:
+    """In-process BM25 inverted index, updated incrementally per document.
+
+    Scores are normalized to [0, 1) by the best score any document could reach for
+    the query, so a single threshold works across queries of different lengths.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def upsert(self, doc_id: str, text: str):
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            self._doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._total_length = 0
+
+    def _idf(self, doc_freq: int, doc_count: int) -> float:
+        return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        query_terms = Counter(tokenize(query))
+        with self._lock:
+            doc_count = len(self._doc_lengths)
+            if not doc_count or not query_terms:
+                return []
+            avg_length = self._total_length / doc_count
+
+            scores: Dict[str, float] = {}
+            # Upper bound: every query term saturating in some document; unknown terms count against the query
+            max_score = 0.0
+            for term, query_tf in query_terms.items():
+                postings = self._postings.get(term, {})
+                idf = self._idf(len(postings), doc_count)
+                max_score += query_tf * idf * (self.k1 + 1)
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + query_tf * idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(doc_id, score / max_score) for doc_id, score in ranked]
+
+def fuse_rankings(vector_results: List[Tuple[str, float]], lexical_results: List[Tuple[str, float]]) -> List[str]:
+    """Reciprocal rank fusion of vector (ascending distance) and lexical (descending score) rankings."""
+    scores: Dict[str, float] = {}
+    for ranking in (vector_results, lexical_results):
+        for rank, (doc_id, _) in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(scores, key=lambda doc_id: scores[doc_id], reverse=True)
+
+# Global instance
+lexical_index = LexicalIndex()
@@ -0,0 +1,144 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def truncate_payload(value: Any, max_chars: int) -> Any:
+    """Return ``value`` unchanged if its JSON form fits in max_chars, else a clipped string."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str, ensure_ascii=False)
+    if len(text) <= max_chars:
+        return value
+    return f"{text[:max_chars]}... [truncated {len(text) - max_chars} chars]"
+
+class AsyncLogWriter:
+    """Background JSON-lines writer with a bounded queue, grouped flushes and rotation.
+
+    ``write`` only enqueues, so callers never wait on the file system. A background task
+    flushes queued lines together every ``flush_interval`` seconds (sooner once
+    ``batch_size`` lines are waiting) through one long-lived file handle on a worker thread.
+    The file is rotated when it exceeds ``max_bytes`` or on the first write of a new day;
+    rotated files are gzipped and deleted after ``retention_days``. When the queue is full,
+    new lines are dropped and counted rather than blocking.
+    """
+
+    def __init__(self, path: Path, max_queue: Optional[int] = None, batch_size: Optional[int] = None, flush_interval: Optional[float] = None, max_bytes: Optional[int] = None, retention_days: Optional[int] = None):
+        self.path = Path(path)
+        self.max_queue = max_queue or int(os.getenv("TOOL_LOG_QUEUE_SIZE", "10000"))
+        self.batch_size = batch_size or int(os.getenv("TOOL_LOG_BATCH_SIZE", "200"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("TOOL_LOG_FLUSH_INTERVAL_SECONDS", "1"))
+        self.max_bytes = max_bytes or int(os.getenv("TOOL_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+        self.retention_days = retention_days or int(os.getenv("TOOL_LOG_RETENTION_DAYS", "30"))
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._file = None
+        self._file_path: Optional[Path] = None
+        self._day: Optional[date] = None
+
+    def write(self, line: str):
+        """Queue one log line. Never blocks."""
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            pending = self._drain() if self._queue is not None else []
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            for queued in pending:
+                self._queue.put_nowait(queued)
+            self._closing = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _drain(self) -> List[str]:
+        lines = []
+        while not self._queue.empty():
+            lines.append(self._queue.get_nowait())
+        return lines
+
+    async def _run(self):
+        while not self._closing.is_set():
+            if self._queue.qsize() < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._closing.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            lines = self._drain()
+            if lines:
+                try:
+                    await asyncio.to_thread(self._write_lines, lines)
+                except Exception as e:
+                    logger.error(f"Failed to write {len(lines)} tool log lines: {e}")
+
+    def _open(self):
+        self._close_file()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._day = date.fromtimestamp(self.path.stat().st_mtime) if self.path.exists() else date.today()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._file_path = self.path
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_lines(self, lines: List[str]):
+        if self._file is None or self._file_path != self.path:
+            self._open()
+        if self._file.tell() >= self.max_bytes or self._day != date.today():
+            self._rotate()
+        self._file.write("".join(line + "\n" for line in lines))
+        self._file.flush()
+        self._day = date.today()
+        self.written += len(lines)
+
+    def _rotate(self):
+        self._close_file()
+        rotated = self.path.with_name(f"{self.path.name}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}")
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        rotated.unlink()
+        self.rotations += 1
+        self._open()
+        self.prune()
+
+    def prune(self):
+        """Delete rotated files older than retention_days."""
+        cutoff = time.time() - self.retention_days * 86400
+        for rotated in self.path.parent.glob(f"{self.path.name}.*"):
+            try:
+                if rotated.stat().st_mtime < cutoff:
+                    rotated.unlink()
+                    logger.info(f"Deleted old log file: {rotated}")
+            except FileNotFoundError:
+                pass
+
+    async def close(self):
+        """Flush everything still queued and close the file."""
+        if self._task is not None and not self._task.done():
+            self._closing.set()
+            await self._task
+        if self._queue is not None:
+            lines = self._drain()
+            if lines:
+                await asyncio.to_thread(self._write_lines, lines)
+        await asyncio.to_thread(self._close_file)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+class _ToolEntries:
+    """LRU + TTL store for one tool's results."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+class ToolResultCache:
+    """Result cache for idempotent tools, keyed by tool name and canonicalized arguments.
+
+    Each tool gets its own LRU with the ``ttl_seconds``/``max_entries`` from its definition.
+    Concurrent calls with the same key share a single execution, and only results that
+    ``is_success`` accepts are stored. Lives on the event loop, so no locking.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, _ToolEntries] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(tool_name: str, args: Any) -> str:
+        canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{tool_name}\x00{canonical}".encode("utf-8")).hexdigest()
+
+    def _entries(self, tool_name: str, max_entries: int, ttl_seconds: float) -> _ToolEntries:
+        entries = self._tools.get(tool_name)
+        if entries is None:
+            entries = self._tools[tool_name] = _ToolEntries(max_entries, ttl_seconds)
+        else:
+            # Picks up tools.json edits on reload
+            entries.max_entries = max_entries
+            entries.ttl_seconds = ttl_seconds
+        return entries
+
+    async def get_or_call(self, tool_name: str, args: Any, call: Callable[[], Awaitable[Any]], ttl_seconds: float, max_entries: int, is_success: Callable[[Any], bool] = lambda result: True) -> Any:
+        entries = self._entries(tool_name, max_entries, ttl_seconds)
+        key = self.make_key(tool_name, args)
+        cached = entries.get(key)
+        if cached is not None:
+            entries.hits += 1
+            return cached[0]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            entries.coalesced += 1
+        else:
+            entries.misses += 1
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+
+            def finish(done: asyncio.Future):
+                self._inflight.pop(key, None)
+                if not done.cancelled() and done.exception() is None and is_success(done.result()):
+                    entries.put(key, done.result())
+
+            task.add_done_callback(finish)
+        # Shielded: one caller timing out must not cancel the execution the others wait on
+        return await asyncio.shield(task)
+
+    def clear(self):
+        self._tools.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        stats = {}
+        for tool_name, entries in self._tools.items():
+            lookups = entries.hits + entries.misses + entries.coalesced
+            stats[tool_name] = {
+                "hits": entries.hits,
+                "misses": entries.misses,
+                "coalesced": entries.coalesced,
+                "evictions": entries.evictions,
+                "hit_rate": (entries.hits + entries.coalesced) / lookups if lookups else 0.0,
+                "size": len(entries.entries),
+                "max_entries": entries.max_entries,
+            }
+        return stats
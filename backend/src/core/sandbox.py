@@ -0,0 +1,177 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name("sandbox_worker.py")
+
+class _Worker:
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.calls = 0
+
+def _error(message: str) -> Dict[str, Any]:
+    return {"stdout": "", "stderr": "", "status": "error", "error": message}
+
+def _describe_exit(returncode: int) -> str:
+    if returncode == -signal.SIGXCPU:
+        return "CPU time limit exceeded"
+    if returncode < 0:
+        return f"killed by {signal.Signals(-returncode).name}"
+    return f"exit code {returncode}"
+
+class SandboxPool:
+    """Warm pool of worker processes that run untrusted Python snippets.
+
+    Each worker runs one snippet at a time with its own stdout/stderr capture, a per-call
+    CPU-time budget and an address-space limit. A snippet that outlives its timeout (or a
+    cancelled call) gets its worker's whole process group killed and a fresh worker started.
+    Workers get a scratch directory and an environment without the server's secrets.
+    """
+
+    def __init__(self, size: Optional[int] = None, timeout: Optional[float] = None, cpu_seconds: Optional[float] = None, memory_mb: Optional[int] = None, max_calls_per_worker: Optional[int] = None, max_output_bytes: Optional[int] = None):
+        self.size = max(1, size or int(os.getenv("SANDBOX_POOL_SIZE", "2")))
+        self.timeout = timeout or float(os.getenv("SANDBOX_TIMEOUT_SECONDS", "8"))
+        self.cpu_seconds = cpu_seconds or float(os.getenv("SANDBOX_CPU_SECONDS", "5"))
+        self.memory_mb = memory_mb if memory_mb is not None else int(os.getenv("SANDBOX_MEMORY_MB", "512"))
+        # Workers are recycled periodically so state leaked by snippets does not accumulate
+        self.max_calls_per_worker = max_calls_per_worker or int(os.getenv("SANDBOX_MAX_CALLS_PER_WORKER", "100"))
+        self.max_output_bytes = max_output_bytes or int(os.getenv("SANDBOX_MAX_OUTPUT_BYTES", "1000000"))
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[_Worker] = set()
+        self._pending: Set[asyncio.Task] = set()
+        self._start_task: Optional[asyncio.Task] = None
+        self._workdir: Optional[str] = None
+        self._closed = False
+
+    async def start(self):
+        """Pre-start all workers. Called lazily by ``run``; call it at startup to pay the cost up front."""
+        failed = self._start_task is not None and self._start_task.done() and (self._start_task.cancelled() or self._start_task.exception() is not None)
+        if self._start_task is None or failed:
+            self._start_task = asyncio.ensure_future(self._start())
+        await self._start_task
+
+    async def _start(self):
+        self._idle = asyncio.Queue()
+        self._workdir = tempfile.mkdtemp(prefix="sandbox-")
+        workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+        logger.info(f"Sandbox pool started with {self.size} workers")
+
+    async def _spawn(self) -> _Worker:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", str(WORKER_SCRIPT), str(self.memory_mb), str(self.max_output_bytes),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=self._workdir,
+            env={"PATH": os.environ.get("PATH", "")},
+            # Own process group, so a timeout also kills anything the snippet started
+            start_new_session=True,
+            limit=4 * self.max_output_bytes + 65536
+        )
+        worker = _Worker(proc)
+        self._workers.add(worker)
+        return worker
+
+    async def _acquire(self) -> _Worker:
+        await self.start()
+        while True:
+            if self._closed:
+                raise RuntimeError("Sandbox pool is closed")
+            if self._idle.empty() and len(self._workers) + len(self._pending) < self.size:
+                # A previous respawn failed; try again rather than waiting forever
+                self._start_replacement()
+            worker = await self._idle.get()
+            if worker.proc.returncode is None:
+                return worker
+            self._retire(worker)
+
+    def _kill(self, worker: _Worker):
+        self._workers.discard(worker)
+        if worker.proc.returncode is None:
+            try:
+                os.killpg(worker.proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _retire(self, worker: _Worker):
+        self._kill(worker)
+        if not self._closed:
+            self._start_replacement(worker)
+
+    def _start_replacement(self, old: Optional[_Worker] = None):
+        task = asyncio.create_task(self._replace(old))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _replace(self, old: Optional[_Worker]):
+        if old is not None:
+            await old.proc.wait()
+        try:
+            worker = await self._spawn()
+        except Exception as e:
+            logger.error(f"Failed to start sandbox worker: {e}")
+            return
+        if self._closed:
+            self._kill(worker)
+        else:
+            self._idle.put_nowait(worker)
+
+    async def run(self, code: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Execute ``code`` in a pooled worker. Returns stdout, stderr, status and, on failure, error."""
+        timeout = timeout or self.timeout
+        worker = await self._acquire()
+        reusable = False
+        try:
+            request = json.dumps({"code": code, "cpu_seconds": self.cpu_seconds}) + "\n"
+            worker.proc.stdin.write(request.encode("utf-8"))
+            await worker.proc.stdin.drain()
+            line = await asyncio.wait_for(worker.proc.stdout.readline(), timeout=timeout)
+            if not line:
+                return _error(f"Sandbox worker died ({_describe_exit(await worker.proc.wait())})")
+            worker.calls += 1
+            reusable = worker.calls < self.max_calls_per_worker
+            return json.loads(line)
+        except asyncio.TimeoutError:
+            return _error(f"Execution timed out after {timeout}s")
+        except (BrokenPipeError, ConnectionResetError, ValueError) as e:
+            return _error(f"Sandbox worker failed: {e}")
+        finally:
+            # Timeouts and cancellations land here too: the worker may still be running the snippet
+            if reusable:
+                self._idle.put_nowait(worker)
+            else:
+                self._retire(worker)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "workers": len(self._workers),
+            "idle": self._idle.qsize() if self._idle else 0,
+            "starting": len(self._pending),
+        }
+
+    async def close(self):
+        self._closed = True
+        for task in list(self._pending):
+            task.cancel()
+        workers = list(self._workers)
+        for worker in workers:
+            self._kill(worker)
+        for worker in workers:
+            await worker.proc.wait()
+        if self._workdir:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+
+# Global instance used by the code_execution tool
+sandbox_pool = SandboxPool()
@@ -0,0 +1,71 @@
+"""Sandbox worker process, started by src/core/sandbox.py.
+
+Reads one JSON request per line from stdin ({"code": ..., "cpu_seconds": ...}) and answers
+with one JSON line per snippet. Only uses the standard library: it runs with ``python -I``.
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Non-POSIX platforms run without rlimits
+    resource = None
+
+def limit_memory(memory_mb: int):
+    if resource and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def limit_cpu(seconds: float):
+    # RLIMIT_CPU counts the whole process lifetime, so each call gets its budget on top of what was used
+    if resource and seconds > 0:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def clip(text: str, max_bytes: int) -> str:
+    if len(text) <= max_bytes:
+        return text
+    return text[:max_bytes] + f"\n... [truncated {len(text) - max_bytes} characters]"
+
+def execute(code: str, max_output: int) -> dict:
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    result = {"status": "success"}
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exec(compile(code, "<snippet>", "exec"), {"__name__": "__main__"})
+    except BaseException as e:
+        # SystemExit and KeyboardInterrupt from the snippet must not stop the worker
+        # The sandbox itself worked: tool breakers must not count the snippet's own errors
+        result = {"status": "error", "error": str(e) or type(e).__name__, "caller_error": True}
+    result["stdout"] = clip(stdout.getvalue(), max_output)
+    result["stderr"] = clip(stderr.getvalue(), max_output)
+    return result
+
+def main():
+    memory_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    max_output = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    # Replies go over a private copy of stdout; fd 1 is pointed at stderr so snippets
+    # writing to it directly cannot corrupt the protocol. stdin is hidden the same way.
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+    requests = sys.stdin
+    sys.stdin = io.StringIO()
+    limit_memory(memory_mb)
+
+    for line in requests:
+        request = json.loads(line)
+        limit_cpu(request.get("cpu_seconds", 0))
+        channel.write(json.dumps(execute(request["code"], max_output)) + "\n")
+        channel.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from typing import Any, Dict, List
+
+from jsonschema import Draft202012Validator
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
+
+def compile_validator(schema: Dict[str, Any]) -> Validator:
+    """A reusable validator for a tool's input_schema. Raises jsonschema.SchemaError for invalid schemas."""
+    cls = validator_for(schema, default=Draft202012Validator)
+    cls.check_schema(schema)
+    return cls(schema, format_checker=cls.FORMAT_CHECKER)
+
+def validation_errors(validator: Validator, args: Any, limit: int = 5) -> List[str]:
+    """Readable "<path>: <problem>" messages, at most ``limit`` of them."""
+    errors = sorted(validator.iter_errors(args), key=lambda error: list(map(str, error.absolute_path)))
+    messages = [f"{'.'.join(map(str, error.absolute_path)) or '<input>'}: {error.message}" for error in errors[:limit]]
+    if len(errors) > limit:
+        messages.append(f"... and {len(errors) - limit} more")
+    return messages
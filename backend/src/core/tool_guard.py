@@ -0,0 +1,133 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class ToolRejected(Exception):
+    """Raised instead of running a tool whose breaker is open or whose bulkhead is full."""
+
+class ToolGuard:
+    """Bulkhead and circuit breaker for one tool.
+
+    At most ``max_concurrency`` calls run at once and at most ``max_queue`` more wait for a
+    slot; further calls are rejected immediately (None means no limit). After
+    ``failure_threshold`` consecutive failures the breaker opens and calls fail fast for
+    ``reset_seconds``; then a single trial call decides whether it closes again.
+    Lives on the event loop, so no locking.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.max_concurrency: Optional[int] = None
+        self.max_queue: Optional[int] = None
+        self.failure_threshold = 0
+        self.reset_seconds = 30.0
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self.running = 0
+        self.waiting = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._trial_running = False
+
+    def configure(self, max_concurrency: Optional[int], max_queue: Optional[int], failure_threshold: int, reset_seconds: float):
+        if max_concurrency != self.max_concurrency:
+            # Calls already holding a slot release it on the semaphore they acquired
+            self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        raise ToolRejected(f"Tool {self.name} unavailable: {reason}")
+
+    def _admit(self) -> bool:
+        """Check the breaker; returns True when this call is the half-open trial."""
+        if self.state == OPEN:
+            retry_in = self.opened_at + self.reset_seconds - time.monotonic()
+            if retry_in > 0:
+                self._reject(f"circuit open after {self.consecutive_failures} consecutive failures, retry in {retry_in:.0f}s")
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._trial_running:
+                self._reject("circuit half-open, a trial call is in progress")
+            self._trial_running = True
+            return True
+        return False
+
+    def _record(self, success: bool, trial: bool):
+        if success:
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            return
+        self.consecutive_failures += 1
+        if trial or (self.failure_threshold > 0 and self.consecutive_failures >= self.failure_threshold and self.state == CLOSED):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+
+    async def run(self, call: Callable[[], Awaitable[Any]], is_success: Callable[[Any], bool] = lambda result: True) -> Any:
+        slots = self._slots
+        if slots is not None and self.running >= self.max_concurrency and self.max_queue is not None and self.waiting >= self.max_queue:
+            self._reject(f"{self.running} calls running and {self.waiting} queued")
+        trial = self._admit()
+        try:
+            if slots is not None:
+                self.waiting += 1
+                try:
+                    await slots.acquire()
+                finally:
+                    self.waiting -= 1
+            self.running += 1
+            try:
+                result = await call()
+            except Exception:
+                self._record(False, trial)
+                raise
+            finally:
+                self.running -= 1
+                if slots is not None:
+                    slots.release()
+            self._record(is_success(result), trial)
+            return result
+        finally:
+            if trial:
+                self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = max(0.0, self.opened_at + self.reset_seconds - time.monotonic()) if self.state == OPEN else 0.0
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "retry_in_seconds": round(retry_in, 1),
+            "running": self.running,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
+
+class ToolGuards:
+    """One ToolGuard per tool name, configured from its ToolDefinition."""
+
+    def __init__(self):
+        self._guards: Dict[str, ToolGuard] = {}
+
+    def get(self, tool: Any) -> ToolGuard:
+        guard = self._guards.get(tool.name)
+        if guard is None:
+            guard = self._guards[tool.name] = ToolGuard(tool.name)
+        # Picks up tools.json edits on reload
+        guard.configure(tool.max_concurrency, tool.max_queue, tool.breaker_failure_threshold, tool.breaker_reset_seconds)
+        return guard
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: guard.stats() for name, guard in self._guards.items()}
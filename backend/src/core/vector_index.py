@@ -0,0 +1,217 @@
+import math
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+STORAGE_TYPES = ("float32", "float16", "int8")
+
+@dataclass(frozen=True)
+class IndexConfig:
+    """Index backend selection and tuning knobs, read from the environment by default."""
+    index_type: str = "auto"
+    hnsw_threshold: int = 10_000
+    ivfpq_threshold: int = 100_000
+    hnsw_m: int = 32
+    hnsw_ef_construction: int = 80
+    hnsw_ef_search: int = 64
+    ivf_nlist: int = 0  # 0 = derive from collection size
+    ivf_nprobe: int = 16
+    pq_m: int = 64
+    pq_nbits: int = 8
+    # Compact storage for flat/HNSW codes; IVF-PQ is always product-quantized
+    storage: str = "float32"
+    # Candidates re-scored with full-precision vectors after a compact search (0 = off)
+    rerank_candidates: int = 0
+
+    @classmethod
+    def from_env(cls) -> "IndexConfig":
+        index_type = os.getenv("VECTOR_INDEX_TYPE", "auto").lower()
+        if index_type not in INDEX_TYPES + ("auto",):
+            raise ValueError(f"Unknown VECTOR_INDEX_TYPE: {index_type}")
+        storage = os.getenv("VECTOR_STORAGE", "float32").lower()
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown VECTOR_STORAGE: {storage}")
+        return cls(
+            index_type=index_type,
+            hnsw_threshold=int(os.getenv("VECTOR_INDEX_HNSW_THRESHOLD", "10000")),
+            ivfpq_threshold=int(os.getenv("VECTOR_INDEX_IVFPQ_THRESHOLD", "100000")),
+            hnsw_m=int(os.getenv("HNSW_M", "32")),
+            hnsw_ef_construction=int(os.getenv("HNSW_EF_CONSTRUCTION", "80")),
+            hnsw_ef_search=int(os.getenv("HNSW_EF_SEARCH", "64")),
+            ivf_nlist=int(os.getenv("IVF_NLIST", "0")),
+            ivf_nprobe=int(os.getenv("IVF_NPROBE", "16")),
+            pq_m=int(os.getenv("PQ_M", "64")),
+            pq_nbits=int(os.getenv("PQ_NBITS", "8")),
+            storage=storage,
+            rerank_candidates=int(os.getenv("VECTOR_RERANK_CANDIDATES", "0")),
+        )
+
+    def with_type(self, index_type: str) -> "IndexConfig":
+        return replace(self, index_type=index_type)
+
+def choose_index_type(config: IndexConfig, size: int) -> str:
+    """Resolve "auto" to a concrete backend for a collection of ``size`` vectors."""
+    if config.index_type != "auto":
+        return config.index_type
+    if size >= config.ivfpq_threshold:
+        return "ivfpq"
+    if size >= config.hnsw_threshold:
+        return "hnsw"
+    return "flat"
+
+def _nlist_for(config: IndexConfig, size: int) -> int:
+    if config.ivf_nlist > 0:
+        return config.ivf_nlist
+    return max(1, int(4 * math.sqrt(size)))
+
+def _pq_m_for(config: IndexConfig, dimension: int) -> int:
+    # PQ needs the dimension to split evenly into sub-quantizers
+    m = min(config.pq_m, dimension)
+    while dimension % m:
+        m -= 1
+    return m
+
+def can_train(index_type: str, config: IndexConfig, size: int) -> bool:
+    if index_type != "ivfpq":
+        return True
+    # k-means wants enough points per centroid, and each PQ codebook needs 2**nbits points
+    return size >= max(_nlist_for(config, size) * 39, 2 ** config.pq_nbits)
+
+_SQ_TYPES = {
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+def _train_scalar_quantizer(index: faiss.Index, dimension: int, training_vectors: Optional[np.ndarray]):
+    # int8 learns a per-dimension [min, max] from the vectors it will encode; float16 ignores the data.
+    # An index built before any vectors exist falls back to the unit range compact vectors lie in
+    # and is retrained by the store once real vectors arrive (see needs_retraining).
+    if training_vectors is None or not len(training_vectors):
+        training_vectors = np.stack([-np.ones(dimension, dtype=np.float32), np.ones(dimension, dtype=np.float32)])
+    index.train(np.ascontiguousarray(training_vectors, dtype=np.float32))
+
+def build_index(index_type: str, dimension: int, config: IndexConfig, training_vectors: Optional[np.ndarray] = None) -> faiss.Index:
+    """Create an empty ID-mapped index of the given type; IVF-PQ and int8 storage are trained on ``training_vectors``."""
+    if index_type == "flat":
+        if config.storage == "float32":
+            base = faiss.IndexFlatL2(dimension)
+        else:
+            base = faiss.IndexScalarQuantizer(dimension, _SQ_TYPES[config.storage], faiss.METRIC_L2)
+            _train_scalar_quantizer(base, dimension, training_vectors)
+    elif index_type == "hnsw":
+        if config.storage == "float32":
+            base = faiss.IndexHNSWFlat(dimension, config.hnsw_m)
+        else:
+            base = faiss.IndexHNSWSQ(dimension, _SQ_TYPES[config.storage], config.hnsw_m)
+            _train_scalar_quantizer(base, dimension, training_vectors)
+        base.hnsw.efConstruction = config.hnsw_ef_construction
+    elif index_type == "ivfpq":
+        size = 0 if training_vectors is None else len(training_vectors)
+        if not can_train(index_type, config, size):
+            raise ValueError(f"ivfpq needs more training vectors than {size}")
+        quantizer = faiss.IndexFlatL2(dimension)
+        base = faiss.IndexIVFPQ(quantizer, dimension, _nlist_for(config, size), _pq_m_for(config, dimension), config.pq_nbits)
+        base.train(np.ascontiguousarray(training_vectors, dtype=np.float32))
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+
+    index = faiss.IndexIDMap2(base)
+    configure_search(index, config)
+    return index
+
+def base_index(index: faiss.Index) -> faiss.Index:
+    index = faiss.downcast_index(index)
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(index.index)
+    return index
+
+def index_type_of(index: faiss.Index) -> str:
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivfpq"
+    return "flat"
+
+def storage_of(index: faiss.Index) -> str:
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base = faiss.downcast_index(base.storage)
+    if isinstance(base, faiss.IndexScalarQuantizer):
+        return "float16" if base.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "int8"
+    return "float32"
+
+def needs_retraining(index: faiss.Index) -> bool:
+    """Whether the index's quantizer was fit to its data (IVF centroids, int8 ranges) and goes stale as it grows."""
+    return index_type_of(index) == "ivfpq" or storage_of(index) == "int8"
+
+def supports_remove(index: faiss.Index) -> bool:
+    # HNSW graphs cannot drop nodes; those indexes are rebuilt instead
+    return index_type_of(index) != "hnsw"
+
+def configure_search(index: faiss.Index, config: IndexConfig):
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = config.hnsw_ef_search
+    elif isinstance(base, faiss.IndexIVF):
+        base.nprobe = config.ivf_nprobe
+
+def search_parameters(index: faiss.Index, config: IndexConfig, selector: faiss.IDSelector) -> faiss.SearchParameters:
+    """Per-search parameters that restrict results to ``selector``.
+
+    Backend-specific parameter objects replace the index's own efSearch/nprobe, so the
+    configured values are carried over.
+    """
+    base = base_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=config.hnsw_ef_search)
+    if isinstance(base, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=config.ivf_nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+def evaluate_index(index_type: str, config: IndexConfig, vectors: np.ndarray, queries: np.ndarray, k: int, ground_truth: np.ndarray) -> Dict[str, object]:
+    """Build an index over ``vectors`` and measure recall@k and latency against exact ``ground_truth`` labels."""
+    if not can_train(index_type, config, len(vectors)):
+        return {"index_type": index_type, "skipped": f"not enough vectors to train ({len(vectors)})"}
+
+    build_start = time.perf_counter()
+    index = build_index(index_type, vectors.shape[1], config, vectors)
+    index.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    latencies: List[float] = []
+    hits = 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, labels = index.search(query.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(labels[0].tolist()) & set(ground_truth[i].tolist()))
+
+    latencies.sort()
+    return {
+        "index_type": index_type,
+        f"recall@{k}": hits / (len(queries) * k) if len(queries) else 0.0,
+        "latency_ms_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_ms_p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+        "build_ms": build_ms,
+    }
+
+def recall_report(vectors: np.ndarray, config: IndexConfig, k: int = 10, sample_size: int = 100, index_types: Optional[List[str]] = None, seed: int = 0) -> List[Dict[str, object]]:
+    """Compare index backends against the exact flat baseline on a sample of the indexed vectors."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if len(vectors) == 0:
+        return []
+    k = min(k, len(vectors))
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), size=min(sample_size, len(vectors)), replace=False)]
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, ground_truth = exact.search(queries, k)
+
+    return [evaluate_index(index_type, config, vectors, queries, k, ground_truth) for index_type in (index_types or list(INDEX_TYPES))]
@@ -1,57 +1,805 @@
+import asyncio
+import hashlib
+import json
 import os
+import threading
+import time
+import uuid
 import faiss
 import numpy as np
-from typing import List, Tuple, Optional
-import google.generativeai as genai
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Tuple, Optional
 from dotenv import load_dotenv
+from src.core.embeddings import EmbeddingProvider, get_embedding_provider
+from src.core.embedding_cache import EmbeddingCache, QueryEmbeddingCache, embedding_cache, query_embedding_cache
+from src.core import vector_index
+from src.core.vector_index import IndexConfig
 
 load_dotenv()
 
+# Filterable metadata, attribute -> values, e.g. {"complexity": ["SIMPLE"], "tag": ["finance", "pdf"]}
+Attributes = Dict[str, List[str]]
+
+# Bumped whenever the snapshot layout changes; snapshots of any other format are ignored and rebuilt
+SNAPSHOT_FORMAT = 2
+
+@dataclass(frozen=True)
+class IndexGeneration:
+    """One published version of the index and its ID mapping. Never mutated after publication."""
+    number: int
+    index: faiss.Index
+    # Source text per skill, used to rebuild or retrain the index from cached embeddings
+    texts: Dict[str, str]
+    # FAISS labels are int64, so string skill IDs are mapped to stable integer labels
+    label_by_id: Dict[str, int]
+    id_by_label: Dict[int, str]
+    next_label: int = 0
+    trained_size: int = 0
+    # IDs indexed with a zero-vector fallback because embedding failed
+    degraded_ids: FrozenSet[str] = frozenset()
+    # The index is a read-only memory-mapped snapshot file
+    mmapped: bool = False
+    attributes: Dict[str, Attributes] = field(default_factory=dict)
+    # One bool per label for every (attribute, value) pair; may be shorter than next_label
+    bitmaps: Dict[Tuple[str, str], np.ndarray] = field(default_factory=dict)
+    # Vectors written since the main index was last built or compacted, searched exactly beside it
+    delta: Optional[faiss.Index] = None
+    delta_vectors: Optional[np.ndarray] = None
+    delta_labels: Optional[np.ndarray] = None
+    # Labels still in the main index whose skill has since been replaced or removed
+    tombstones: FrozenSet[int] = frozenset()
+    # Names the main index in snapshot files; changes whenever the main index does
+    index_key: str = ""
+
+def _new_index_key() -> str:
+    return uuid.uuid4().hex[:16]
+
+def _build_bitmaps(attributes: Dict[str, Attributes], label_by_id: Dict[str, int], size: int) -> Dict[Tuple[str, str], np.ndarray]:
+    bitmaps: Dict[Tuple[str, str], np.ndarray] = {}
+    for skill_id, values_by_attribute in attributes.items():
+        label = label_by_id.get(skill_id)
+        if label is None:
+            continue
+        for attribute, values in values_by_attribute.items():
+            for value in values:
+                bitmap = bitmaps.get((attribute, value))
+                if bitmap is None:
+                    bitmap = bitmaps[(attribute, value)] = np.zeros(size, dtype=bool)
+                bitmap[label] = True
+    return bitmaps
+
+def _update_bitmaps(bitmaps: Dict[Tuple[str, str], np.ndarray], removed: List[Tuple[int, Attributes]], added: List[Tuple[int, Attributes]], size: int) -> Dict[Tuple[str, str], np.ndarray]:
+    """Copy of ``bitmaps`` where only the (attribute, value) pairs of ``removed`` and ``added`` labels are rewritten."""
+    bitmaps = dict(bitmaps)
+    rewritten = set()
+    changes = [(label, attrs, False) for label, attrs in removed] + [(label, attrs, True) for label, attrs in added]
+    for label, values_by_attribute, present in changes:
+        for attribute, values in values_by_attribute.items():
+            for value in values:
+                key = (attribute, value)
+                if key not in rewritten:
+                    old = bitmaps.get(key)
+                    if old is None and not present:
+                        continue
+                    bitmap = np.zeros(size, dtype=bool)
+                    if old is not None:
+                        bitmap[:len(old)] = old
+                    bitmaps[key] = bitmap
+                    rewritten.add(key)
+                bitmaps[key][label] = present
+    return bitmaps
+
 class VectorStore:
-    def __init__(self, dimension: int = 3072): # Default for gemini-embedding-001 is 3072
-        self.dimension = dimension
-        self.index = faiss.IndexFlatL2(dimension)
-        self.skill_ids: List[str] = []
-        
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-
-    def get_embedding(self, text: str) -> np.ndarray:
+    """FAISS-backed semantic index with copy-on-write updates.
+
+    Writers build each new index off to the side and publish it with a single reference
+    swap, so a search always runs against one complete generation and never waits on a writer.
+    Incremental upserts and removals never copy the main index: new vectors go to a small
+    exact delta index and replaced labels are tombstoned, both folded into a fresh main index
+    once they grow comparable to it (at most VECTOR_DELTA_MAX_SIZE pending changes).
+    """
+    def __init__(self, dimension: Optional[int] = None, cache: Optional[EmbeddingCache] = None, query_cache: Optional[QueryEmbeddingCache] = None, index_config: Optional[IndexConfig] = None, provider: Optional[EmbeddingProvider] = None):
+        self.provider = provider or get_embedding_provider()
+        self.model = self.provider.model
+        # Dimensions below the provider's native size truncate (Matryoshka) and re-normalize;
+        # vectors are never padded, so larger settings are clamped to the native size
+        configured = dimension or int(os.getenv("EMBEDDING_DIMENSION", str(self.provider.native_dimension)))
+        self.dimension = min(configured, self.provider.native_dimension)
+        if configured > self.dimension:
+            print(f"Warning: EMBEDDING_DIMENSION={configured} exceeds {self.model}'s {self.dimension} dimensions; using {self.dimension}")
+        self.index_config = index_config or IndexConfig.from_env()
+        self.cache = cache or embedding_cache
+        self.query_cache = query_cache or query_embedding_cache
+        self.batch_size = max(1, int(os.getenv("EMBEDDING_BATCH_SIZE", "100")))
+        self.query_timeout = float(os.getenv("QUERY_EMBEDDING_TIMEOUT_SECONDS", "2"))
+        # After a failed call, skip remote embedding entirely for this long
+        self.retry_after = float(os.getenv("EMBEDDING_RETRY_AFTER_SECONDS", "30"))
+        self._embedding_down_until = 0.0
+        # Async embedding: bounded concurrency, per-call timeout and retry with exponential backoff
+        self.max_concurrency = max(1, int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4")))
+        self.embed_timeout = float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", "30"))
+        self.max_retries = max(0, int(os.getenv("EMBEDDING_MAX_RETRIES", "2")))
+        self.retry_backoff = float(os.getenv("EMBEDDING_RETRY_BACKOFF_SECONDS", "0.5"))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.delta_max_size = max(1, int(os.getenv("VECTOR_DELTA_MAX_SIZE", "512")))
+        # Writers are serialized; readers take self._current once and never lock
+        self._write_lock = threading.Lock()
+        self._current = self._empty_generation(0)
+
+    def _new_index(self) -> faiss.Index:
+        return vector_index.build_index(self._target_type(0), self.dimension, self.index_config)
+
+    def _empty_generation(self, number: int) -> IndexGeneration:
+        return IndexGeneration(number=number, index=self._new_index(), texts={}, label_by_id={}, id_by_label={}, index_key=_new_index_key(), **self._delta_changes())
+
+    def _delta_changes(self, vectors: Optional[np.ndarray] = None, labels: Optional[np.ndarray] = None) -> dict:
+        if vectors is None or not len(vectors):
+            return {"delta": None, "delta_vectors": np.zeros((0, self.dimension), dtype=np.float32), "delta_labels": np.zeros(0, dtype=np.int64)}
+        delta = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+        delta.add_with_ids(vectors, labels)
+        return {"delta": delta, "delta_vectors": vectors, "delta_labels": labels}
+
+    def _target_type(self, size: int) -> str:
+        index_type = vector_index.choose_index_type(self.index_config, size)
+        if not vector_index.can_train(index_type, self.index_config, size):
+            return "flat"
+        return index_type
+
+    @property
+    def current(self) -> IndexGeneration:
+        """The latest published generation; hold on to it for a consistent view."""
+        return self._current
+
+    @property
+    def generation(self) -> int:
+        return self._current.number
+
+    @property
+    def index(self) -> faiss.Index:
+        """The main index; recent writes may still sit in the delta, see ``size``."""
+        return self._current.index
+
+    @property
+    def size(self) -> int:
+        return len(self._current.label_by_id)
+
+    @property
+    def index_type(self) -> str:
+        return vector_index.index_type_of(self._current.index)
+
+    def _publish(self, **changes):
+        generation = replace(self._current, number=self._current.number + 1, **changes)
+        if "bitmaps" not in changes:
+            generation = replace(generation, bitmaps=_build_bitmaps(generation.attributes, generation.label_by_id, generation.next_label))
+        self._current = generation
+
+    def _needs_rebuild(self, current: IndexGeneration, size: int) -> bool:
+        index_type = vector_index.index_type_of(current.index)
+        if self._target_type(size) != index_type:
+            return True
+        if vector_index.storage_of(current.index) != self.index_config.storage and index_type != "ivfpq":
+            return True
+        # Retrain IVF centroids and int8 ranges once the collection has far outgrown the training set
+        return vector_index.needs_retraining(current.index) and size > 4 * current.trained_size
+
+    def rebuild(self):
+        """Rebuild the index from cached embeddings, picking and training the backend for the current size."""
+        with self._write_lock:
+            self._rebuild_locked(self._current.texts, self._current.attributes)
+
+    def _rebuild_locked(self, texts: Dict[str, str], attributes: Dict[str, Attributes], known: Optional[Dict[str, np.ndarray]] = None, known_failed: Optional[set] = None):
+        """Rebuild from ``known`` vectors (text -> embedding) where given; only the rest are looked up."""
+        vectors = dict(known or {})
+        failed_texts = {text for text in known_failed or () if text in vectors}
+        missing = [text for text in dict.fromkeys(texts.values()) if text not in vectors]
+        if missing:
+            vectors.update(zip(missing, self.get_embeddings(missing, failed=failed_texts)))
+        self._publish_fresh(texts, self._stack(list(texts.values()), vectors), failed_texts, attributes)
+
+    def _publish_fresh(self, texts: Dict[str, str], embeddings: np.ndarray, failed_texts: set, attributes: Dict[str, Attributes]):
+        """Build a whole new index for ``texts`` off to the side, then swap it in."""
+        ids = list(texts)
+        index = vector_index.build_index(self._target_type(len(ids)), self.dimension, self.index_config, embeddings)
+        index.add_with_ids(embeddings, np.arange(len(ids), dtype=np.int64))
+        self._publish(
+            index=index,
+            texts=dict(texts),
+            label_by_id={skill_id: label for label, skill_id in enumerate(ids)},
+            id_by_label=dict(enumerate(ids)),
+            next_label=len(ids),
+            trained_size=len(ids),
+            degraded_ids=frozenset(skill_id for skill_id in ids if texts[skill_id] in failed_texts),
+            mmapped=False,
+            attributes={skill_id: attributes[skill_id] for skill_id in ids if skill_id in attributes},
+            tombstones=frozenset(),
+            index_key=_new_index_key(),
+            **self._delta_changes(),
+        )
+
+    def compact(self):
+        """Fold the delta and tombstones into a new main index now instead of waiting for the threshold."""
+        with self._write_lock:
+            self._compact_locked()
+
+    def _should_compact(self, current: IndexGeneration) -> bool:
+        pending = len(current.delta_labels) + len(current.tombstones)
+        # Compaction copies the main index, so it waits until pending changes are comparable to its size
+        return pending > min(self.delta_max_size, current.index.ntotal)
+
+    def _compact_locked(self):
+        current = self._current
+        if not len(current.delta_labels) and not current.tombstones:
+            return
+        if not vector_index.supports_remove(current.index):
+            self._rebuild_locked(current.texts, current.attributes)
+            return
+        index = self._copy_index(current.index)
+        if current.tombstones:
+            index.remove_ids(np.fromiter(current.tombstones, dtype=np.int64))
+        if len(current.delta_labels):
+            index.add_with_ids(current.delta_vectors, current.delta_labels)
+        # Labels are unchanged, so the bitmaps carry over
+        self._publish(index=index, mmapped=False, tombstones=frozenset(), index_key=_new_index_key(), bitmaps=current.bitmaps, **self._delta_changes())
+
+    @property
+    def skill_ids(self) -> List[str]:
+        return list(self._current.label_by_id.keys())
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self._current.label_by_id
+
+    def embeddings_available(self) -> bool:
+        return time.monotonic() >= self._embedding_down_until
+
+    def _mark_embedding_failure(self):
+        self._embedding_down_until = time.monotonic() + self.retry_after
+
+    def _compact(self, vectors: np.ndarray) -> np.ndarray:
+        """Truncate raw embeddings to the index dimension and re-normalize when compact mode is on."""
+        truncated = vectors.shape[-1] > self.dimension
+        if truncated:
+            vectors = vectors[..., :self.dimension]
+        if truncated or self.index_config.storage != "float32":
+            norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+            vectors = vectors / np.where(norms > 0, norms, 1.0)
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def get_embedding(self, text: str, task_type: str = "retrieval_document") -> np.ndarray:
+        # Failed embeddings come back as a zero vector to avoid crashing callers
+        return self.get_embeddings([text], task_type)[0]
+
+    def get_query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Embed a search query, served from the in-memory LRU cache when possible.
+
+        Returns None when the embedding service is failing, slow or in its retry back-off window.
+        """
+        key = self.query_cache.make_key(self.model, "retrieval_query", query)
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            return cached
+        if not self.embeddings_available():
+            return None
+
         try:
-            result = genai.embed_content(
-                model="models/gemini-embedding-001",
-                content=text,
-                task_type="retrieval_document"
-            )
-            return np.array(result['embedding'], dtype=np.float32)
+            embedding = self._compact(self.provider.embed([query], "retrieval_query", timeout=self.query_timeout)[0])
+        except Exception as e:
+            print(f"Query embedding error: {e}")
+            self._mark_embedding_failure()
+            return None
+        self.query_cache.put(key, embedding)
+        return embedding
+
+    async def aget_query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Async get_query_embedding; never blocks the event loop."""
+        key = self.query_cache.make_key(self.model, "retrieval_query", query)
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            return cached
+        if not self.embeddings_available():
+            return None
+
+        try:
+            # Queries are latency-sensitive: one attempt, short timeout, then lexical fallback
+            embedding = self._compact((await self._aembed([query], "retrieval_query", self.query_timeout, retries=0))[0])
         except Exception as e:
-            print(f"Embedding error: {e}")
-            # Return a zero vector as fallback to avoid crashing
-            return np.zeros(self.dimension, dtype=np.float32)
-
-    def add_skill(self, skill_id: str, text: str):
-        embedding = self.get_embedding(text)
-        print(f"DEBUG: Index dim: {self.dimension}, Embedding dim: {len(embedding)}")
-        self.index.add(np.array([embedding]))
-        self.skill_ids.append(skill_id)
-
-    def search(self, query: str, top_k: int = 1) -> List[Tuple[str, float]]:
-        if self.index.ntotal == 0:
+            print(f"Query embedding error: {e}")
+            self._mark_embedding_failure()
+            return None
+        self.query_cache.put(key, embedding)
+        return embedding
+
+    def _lookup_cached(self, texts: List[str], task_type: str) -> Tuple[Dict[str, np.ndarray], List[List[str]]]:
+        """Split unique texts into cached vectors and uncached batches of batch_size."""
+        vectors: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+        for text in dict.fromkeys(texts):
+            cached = self.cache.get(self.cache.make_key(self.model, task_type, text))
+            if cached is not None:
+                vectors[text] = self._compact(cached)
+            else:
+                pending.append(text)
+        return vectors, [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+
+    def _store_batch(self, batch: List[str], embeddings: np.ndarray, task_type: str, vectors: Dict[str, np.ndarray]):
+        for text, embedding in zip(batch, embeddings):
+            self.cache.put(self.cache.make_key(self.model, task_type, text), embedding)
+            vectors[text] = self._compact(embedding)
+
+    def _fail_batch(self, batch: List[str], error: Exception, vectors: Dict[str, np.ndarray], failed: Optional[set]):
+        print(f"Batch embedding error ({len(batch)} texts): {error}")
+        self._mark_embedding_failure()
+        for text in batch:
+            vectors[text] = np.zeros(self.dimension, dtype=np.float32)
+        if failed is not None:
+            failed.update(batch)
+
+    def _stack(self, texts: List[str], vectors: Dict[str, np.ndarray]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([vectors[text] for text in texts])
+
+    def get_embeddings(self, texts: List[str], task_type: str = "retrieval_document", failed: Optional[set] = None) -> np.ndarray:
+        """Embed many texts, sending only uncached unique texts in batches of batch_size.
+
+        Texts whose batch failed get a zero vector and are added to ``failed`` when given.
+        """
+        vectors, batches = self._lookup_cached(texts, task_type)
+        for batch in batches:
+            try:
+                if not self.embeddings_available():
+                    raise RuntimeError("embedding service unavailable, retrying later")
+                self._store_batch(batch, self.provider.embed(batch, task_type), task_type, vectors)
+            except Exception as e:
+                self._fail_batch(batch, e, vectors, failed)
+        return self._stack(texts, vectors)
+
+    async def aget_embeddings(self, texts: List[str], task_type: str = "retrieval_document", failed: Optional[set] = None) -> np.ndarray:
+        """Async get_embeddings: batches run concurrently, bounded by max_concurrency."""
+        vectors, batches = self._lookup_cached(texts, task_type)
+
+        async def embed_batch(batch: List[str]):
+            try:
+                if not self.embeddings_available():
+                    raise RuntimeError("embedding service unavailable, retrying later")
+                self._store_batch(batch, await self._aembed(batch, task_type, self.embed_timeout), task_type, vectors)
+            except Exception as e:
+                self._fail_batch(batch, e, vectors, failed)
+
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return self._stack(texts, vectors)
+
+    async def _aembed(self, texts: List[str], task_type: str, timeout: float, retries: Optional[int] = None) -> np.ndarray:
+        # Providers are synchronous; run them on a worker thread so the event loop keeps serving
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            try:
+                async with self._semaphore:
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(self.provider.embed, texts, task_type, timeout),
+                        timeout=timeout
+                    )
+            except Exception:
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+    def _copy_index(self, index: faiss.Index) -> faiss.Index:
+        # A private, writable copy; also detaches memory-mapped snapshots from their file
+        index = faiss.deserialize_index(faiss.serialize_index(index))
+        vector_index.configure_search(index, self.index_config)
+        return index
+
+    def upsert_many(self, ids: List[str], texts: List[str], attributes: Optional[List[Attributes]] = None):
+        """Bulk insert or replace skills with batched embedding calls and a single index insert.
+
+        ``attributes`` (aligned with ``ids``) feed the metadata filters of ``search``.
+        """
+        latest = self._latest(ids, texts)
+        if not latest:
+            return
+        failed_texts: set = set()
+        embeddings = self.get_embeddings(list(latest.values()), failed=failed_texts)
+        self._apply_upsert(latest, embeddings, failed_texts, self._latest_attributes(ids, attributes))
+
+    async def aupsert_many(self, ids: List[str], texts: List[str], attributes: Optional[List[Attributes]] = None):
+        """Async upsert_many; embedding round trips never block the event loop."""
+        latest = self._latest(ids, texts)
+        if not latest:
+            return
+        failed_texts: set = set()
+        embeddings = await self.aget_embeddings(list(latest.values()), failed=failed_texts)
+        known: Dict[str, np.ndarray] = {}
+        current = self._current
+        if self._needs_rebuild(current, len({**current.texts, **latest})):
+            # Fetch the rest of the collection here as well, so the rebuild makes no blocking embedding calls
+            rest = [text for skill_id, text in current.texts.items() if skill_id not in latest]
+            known = dict(zip(rest, await self.aget_embeddings(rest, failed=failed_texts)))
+        # Waiting on the write lock or a compaction must not stall the event loop
+        await asyncio.to_thread(self._apply_upsert, latest, embeddings, failed_texts, self._latest_attributes(ids, attributes), known)
+
+    def replace_all(self, ids: List[str], texts: List[str], attributes: Optional[List[Attributes]] = None):
+        """Re-index the whole collection and publish it in one swap; searches keep using the old index meanwhile."""
+        latest = self._latest(ids, texts)
+        failed_texts: set = set()
+        embeddings = self.get_embeddings(list(latest.values()), failed=failed_texts)
+        with self._write_lock:
+            self._publish_fresh(latest, embeddings, failed_texts, self._latest_attributes(ids, attributes))
+
+    @staticmethod
+    def _latest(ids: List[str], texts: List[str]) -> Dict[str, str]:
+        if len(ids) != len(texts):
+            raise ValueError("ids and texts must have the same length")
+        # Last occurrence wins when the same ID appears twice in one call
+        return dict(zip(ids, texts))
+
+    @staticmethod
+    def _latest_attributes(ids: List[str], attributes: Optional[List[Attributes]]) -> Dict[str, Attributes]:
+        if attributes is None:
+            return {skill_id: {} for skill_id in ids}
+        if len(ids) != len(attributes):
+            raise ValueError("ids and attributes must have the same length")
+        return {skill_id: {key: list(values) for key, values in attrs.items()} for skill_id, attrs in zip(ids, attributes)}
+
+    def _apply_upsert(self, latest: Dict[str, str], embeddings: np.ndarray, failed_texts: set, latest_attributes: Dict[str, Attributes], known: Optional[Dict[str, np.ndarray]] = None):
+        with self._write_lock:
+            current = self._current
+            texts = {**current.texts, **latest}
+            attributes = {**current.attributes, **latest_attributes}
+            if self._needs_rebuild(current, len(texts)):
+                # The new vectors were just fetched; don't look them up a second time
+                self._rebuild_locked(texts, attributes, {**(known or {}), **dict(zip(latest.values(), embeddings))}, failed_texts)
+                return
+            replaced = [skill_id for skill_id in latest if skill_id in current.label_by_id]
+            self._publish_incremental(current, replaced, latest, embeddings, failed_texts, texts, attributes)
+
+    def _publish_incremental(self, current: IndexGeneration, removed_ids: List[str], added: Dict[str, str], embeddings: np.ndarray, failed_texts: set, texts: Dict[str, str], attributes: Dict[str, Attributes]):
+        """Tombstone ``removed_ids`` and append ``added`` to the delta, sharing the main index with ``current``."""
+        label_by_id = dict(current.label_by_id)
+        id_by_label = dict(current.id_by_label)
+        degraded_ids = set(current.degraded_ids)
+        removed_labels = []
+        for skill_id in removed_ids:
+            label = label_by_id.pop(skill_id)
+            del id_by_label[label]
+            degraded_ids.discard(skill_id)
+            removed_labels.append(label)
+
+        labels = np.arange(current.next_label, current.next_label + len(added), dtype=np.int64)
+        for skill_id, label in zip(added, labels.tolist()):
+            label_by_id[skill_id] = label
+            id_by_label[label] = skill_id
+            if added[skill_id] in failed_texts:
+                degraded_ids.add(skill_id)
+
+        # Removed labels still in the delta are dropped from it; the rest are in the main index
+        in_delta = np.isin(current.delta_labels, removed_labels)
+        tombstones = current.tombstones | (set(removed_labels) - set(current.delta_labels[in_delta].tolist()))
+        delta_vectors = np.concatenate([current.delta_vectors[~in_delta], embeddings])
+        delta_labels = np.concatenate([current.delta_labels[~in_delta], labels])
+
+        next_label = current.next_label + len(added)
+        bitmaps = _update_bitmaps(
+            current.bitmaps,
+            [(current.label_by_id[skill_id], current.attributes.get(skill_id, {})) for skill_id in removed_ids],
+            [(label_by_id[skill_id], attributes.get(skill_id, {})) for skill_id in added],
+            next_label,
+        )
+        self._publish(
+            texts=texts,
+            label_by_id=label_by_id,
+            id_by_label=id_by_label,
+            next_label=next_label,
+            degraded_ids=frozenset(degraded_ids),
+            attributes=attributes,
+            bitmaps=bitmaps,
+            tombstones=frozenset(tombstones),
+            **self._delta_changes(delta_vectors, delta_labels),
+        )
+        if self._should_compact(self._current):
+            self._compact_locked()
+
+    def upsert(self, skill_id: str, text: str, attributes: Optional[Attributes] = None):
+        """Insert a skill, replacing any existing vector for the same ID."""
+        self.upsert_many([skill_id], [text], None if attributes is None else [attributes])
+
+    async def aupsert(self, skill_id: str, text: str, attributes: Optional[Attributes] = None):
+        await self.aupsert_many([skill_id], [text], None if attributes is None else [attributes])
+
+    def remove(self, skill_id: str) -> bool:
+        """Drop a skill's vector without touching the rest of the index. No remote calls."""
+        return self.remove_many([skill_id]) == 1
+
+    def remove_many(self, ids: List[str]) -> int:
+        """Drop several skills in one publication; returns how many were indexed."""
+        with self._write_lock:
+            current = self._current
+            removed = [skill_id for skill_id in dict.fromkeys(ids) if skill_id in current.label_by_id]
+            if not removed:
+                return 0
+            texts = {key: text for key, text in current.texts.items() if key not in removed}
+            attributes = {key: attrs for key, attrs in current.attributes.items() if key not in removed}
+            if self._needs_rebuild(current, len(texts)):
+                self._rebuild_locked(texts, attributes)
+            else:
+                self._publish_incremental(current, removed, {}, np.zeros((0, self.dimension), dtype=np.float32), set(), texts, attributes)
+            return len(removed)
+
+    async def aremove_many(self, ids: List[str]) -> int:
+        """Async remove_many; waiting on the write lock or a rebuild never blocks the event loop."""
+        return await asyncio.to_thread(self.remove_many, ids)
+
+    # Kept for callers that predate upsert semantics
+    add_many = upsert_many
+    add_skill = upsert
+
+    def search(self, query: str, top_k: int = 1, filters: Optional[Attributes] = None) -> List[Tuple[str, float]]:
+        """Nearest skills to ``query``; ``filters`` keeps only skills having every given attribute value."""
+        if self.size == 0:
+            return []
+        return self._search_embedding(self.get_query_embedding(query), top_k, filters)
+
+    async def asearch(self, query: str, top_k: int = 1, filters: Optional[Attributes] = None) -> List[Tuple[str, float]]:
+        if self.size == 0:
+            return []
+        return self._search_embedding(await self.aget_query_embedding(query), top_k, filters)
+
+    def search_many(self, queries: List[str], top_k: int = 1, filters: Optional[Attributes] = None) -> List[List[Tuple[str, float]]]:
+        """Search many queries with one batched embedding pass and a single matrix FAISS search."""
+        if self.size == 0 or not queries:
+            return [[] for _ in queries]
+        embeddings, batches = self._lookup_cached_queries(queries)
+        for batch in batches:
+            try:
+                if not self.embeddings_available():
+                    raise RuntimeError("embedding service unavailable, retrying later")
+                self._store_query_batch(batch, self.provider.embed(batch, "retrieval_query", timeout=self.query_timeout), embeddings)
+            except Exception as e:
+                print(f"Query batch embedding error ({len(batch)} queries): {e}")
+                self._mark_embedding_failure()
+        return self._search_matrix(queries, embeddings, top_k, filters)
+
+    async def asearch_many(self, queries: List[str], top_k: int = 1, filters: Optional[Attributes] = None) -> List[List[Tuple[str, float]]]:
+        """Async search_many; embedding batches run concurrently off the event loop."""
+        if self.size == 0 or not queries:
+            return [[] for _ in queries]
+        embeddings, batches = self._lookup_cached_queries(queries)
+
+        async def embed_batch(batch: List[str]):
+            try:
+                if not self.embeddings_available():
+                    raise RuntimeError("embedding service unavailable, retrying later")
+                self._store_query_batch(batch, await self._aembed(batch, "retrieval_query", self.query_timeout, retries=0), embeddings)
+            except Exception as e:
+                print(f"Query batch embedding error ({len(batch)} queries): {e}")
+                self._mark_embedding_failure()
+
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return self._search_matrix(queries, embeddings, top_k, filters)
+
+    def _lookup_cached_queries(self, queries: List[str]) -> Tuple[Dict[str, np.ndarray], List[List[str]]]:
+        embeddings: Dict[str, np.ndarray] = {}
+        pending: List[str] = []
+        for query in dict.fromkeys(queries):
+            cached = self.query_cache.get(self.query_cache.make_key(self.model, "retrieval_query", query))
+            if cached is not None:
+                embeddings[query] = cached
+            else:
+                pending.append(query)
+        return embeddings, [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+
+    def _store_query_batch(self, batch: List[str], raw: np.ndarray, embeddings: Dict[str, np.ndarray]):
+        for query, embedding in zip(batch, self._compact(raw)):
+            self.query_cache.put(self.query_cache.make_key(self.model, "retrieval_query", query), embedding)
+            embeddings[query] = embedding
+
+    def _search_matrix(self, queries: List[str], embeddings: Dict[str, np.ndarray], top_k: int, filters: Optional[Attributes] = None) -> List[List[Tuple[str, float]]]:
+        # Queries whose embedding failed get no vector results rather than zero-vector noise
+        embedded = [query for query in dict.fromkeys(queries) if query in embeddings]
+        by_query: Dict[str, List[Tuple[str, float]]] = {}
+        current = self._current
+        bitmap = None
+        if filters:
+            bitmap = self._filter_bitmap(current, filters)
+            if bitmap is None:
+                return [[] for _ in queries]
+        if embedded:
+            matrix = np.stack([embeddings[query] for query in embedded])
+            fetch_k = max(top_k, self.index_config.rerank_candidates)
+            distances, indices = self._search_generation(current, matrix, fetch_k, bitmap)
+            for row, query in enumerate(embedded):
+                results = [
+                    (current.id_by_label[int(label)], float(distances[row][i]))
+                    for i, label in enumerate(indices[row]) if label != -1
+                ]
+                if self.index_config.rerank_candidates:
+                    results = self._rerank(current, embeddings[query], results)
+                by_query[query] = results[:top_k]
+        return [by_query.get(query, []) for query in queries]
+
+    def _search_generation(self, current: IndexGeneration, matrix: np.ndarray, k: int, bitmap: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the main index, skipping tombstones, and the delta; merge the two by distance."""
+        # Selectors only point into ``bitmap``/``tombstones``; both must stay referenced until the searches return
+        selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap)) if bitmap is not None else None
+        main_selector = selector
+        if selector is None and current.tombstones:
+            # Filter bitmaps already exclude removed labels; unfiltered searches exclude them here
+            tombstones = np.fromiter(current.tombstones, dtype=np.int64)
+            excluded = faiss.IDSelectorBatch(len(tombstones), faiss.swig_ptr(tombstones))
+            main_selector = faiss.IDSelectorNot(excluded)
+        params = vector_index.search_parameters(current.index, self.index_config, main_selector) if main_selector is not None else None
+        if current.index.ntotal:
+            distances, labels = current.index.search(matrix, k, params=params)
+        else:
+            distances, labels = np.full((len(matrix), k), np.inf, dtype=np.float32), np.full((len(matrix), k), -1, dtype=np.int64)
+        if current.delta is None:
+            return distances, labels
+
+        delta_params = faiss.SearchParameters(sel=selector) if selector is not None else None
+        delta_distances, delta_labels = current.delta.search(matrix, k, params=delta_params)
+        distances = np.concatenate([distances, delta_distances], axis=1)
+        labels = np.concatenate([labels, delta_labels], axis=1)
+        # Missing results (label -1) sort last
+        distances = np.where(labels == -1, np.inf, distances)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(labels, order, axis=1)
+
+    def _search_embedding(self, query_embedding: Optional[np.ndarray], top_k: int, filters: Optional[Attributes] = None) -> List[Tuple[str, float]]:
+        if query_embedding is None:
+            # A zero-vector fallback would rank every skill as equally close
             return []
-            
-        query_embedding = self.get_embedding(query)
-        distances, indices = self.index.search(np.array([query_embedding]), top_k)
-        
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx != -1:
-                results.append((self.skill_ids[idx], float(distances[0][i])))
-        return results
+        return self._search_matrix([""], {"": query_embedding}, top_k, filters)[0]
+
+    @staticmethod
+    def _filter_bitmap(current: IndexGeneration, filters: Attributes) -> Optional[np.ndarray]:
+        """AND of the precomputed bitmaps of every filter value, packed for IDSelectorBitmap. None if nothing matches."""
+        mask = np.ones(current.next_label, dtype=bool)
+        for attribute, values in filters.items():
+            for value in values:
+                bitmap = current.bitmaps.get((attribute, value))
+                if bitmap is None:
+                    return None
+                # Bitmaps are not grown for labels added after their last rewrite
+                covered = min(len(bitmap), len(mask))
+                mask[covered:] = False
+                mask[:covered] &= bitmap[:covered]
+        if not mask.any():
+            return None
+        return np.packbits(mask, bitorder="little")
+
+    def _rerank(self, current: IndexGeneration, query_embedding: np.ndarray, candidates: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        """Re-score compact-search candidates with exact float32 distances from the embedding cache.
+
+        Only cached vectors are used (never a remote call); uncached candidates keep their compact distance.
+        """
+        if not candidates:
+            return candidates
+        exact, _ = self._lookup_cached([current.texts[skill_id] for skill_id, _ in candidates], "retrieval_document")
+        rescored = []
+        for skill_id, distance in candidates:
+            vector = exact.get(current.texts[skill_id])
+            if vector is not None:
+                distance = float(np.sum((vector - query_embedding) ** 2))
+            rescored.append((skill_id, distance))
+        return sorted(rescored, key=lambda item: item[1])
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def query_cache_stats(self) -> dict:
+        return self.query_cache.stats()
+
+    def save_snapshot(self, directory: Path, version: str, name: str = "skill_index") -> bool:
+        """Persist the index and its ID mapping, tagged with the registry version it reflects.
+
+        Skipped (returns False) while any vector is a failed-embedding placeholder, so a
+        degraded index is never reused on the next start.
+        """
+        current = self._current
+        if current.degraded_ids:
+            return False
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        meta_path = directory / f"{name}.meta.json"
+        # Index and delta files are never overwritten in place, so the meta file swap is the single
+        # commit point. The main index only changes on rebuild or compaction; until then each save
+        # just writes the small delta file.
+        index_file = f"{name}.{current.index_key}.faiss"
+        if not (directory / index_file).exists():
+            tmp_index = directory / f"{index_file}.{os.getpid()}.tmp"
+            faiss.write_index(current.index, str(tmp_index))
+            os.replace(tmp_index, directory / index_file)
+
+        delta_file = None
+        if len(current.delta_labels):
+            delta_file = f"{name}.{hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]}.delta.npz"
+            tmp_delta = directory / f"{delta_file}.{os.getpid()}.tmp"
+            with open(tmp_delta, "wb") as f:
+                np.savez(f, vectors=current.delta_vectors, labels=current.delta_labels)
+            os.replace(tmp_delta, directory / delta_file)
+
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "model": self.model,
+            "dimension": self.dimension,
+            "storage": self.index_config.storage,
+            "index_file": index_file,
+            "delta_file": delta_file,
+            "tombstones": sorted(current.tombstones),
+            "next_label": current.next_label,
+            "trained_size": current.trained_size,
+            "labels": current.label_by_id,
+            "texts": current.texts,
+            "attributes": current.attributes,
+        }
+        tmp_meta = meta_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_meta.write_text(json.dumps(meta))
+        os.replace(tmp_meta, meta_path)
+
+        for stale in [*directory.glob(f"{name}.*.faiss"), *directory.glob(f"{name}.*.delta.npz")]:
+            if stale.name not in (index_file, delta_file):
+                stale.unlink(missing_ok=True)
+        return True
+
+    def load_snapshot(self, directory: Path, version: str, name: str = "skill_index") -> bool:
+        """Memory-map a snapshot if it matches format, version, model, dimension and storage. Returns False on any mismatch."""
+        meta_path = Path(directory) / f"{name}.meta.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+            expected = (SNAPSHOT_FORMAT, version, self.model, self.dimension, self.index_config.storage)
+            if (meta.get("format"), meta.get("version"), meta.get("model"), meta.get("dimension"), meta.get("storage")) != expected:
+                return False
+            index_path = Path(directory) / meta["index_file"]
+            index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP_IFC)
+            delta_vectors = delta_labels = None
+            if meta.get("delta_file"):
+                with np.load(Path(directory) / meta["delta_file"]) as delta:
+                    delta_vectors, delta_labels = delta["vectors"], delta["labels"]
+            tombstones = frozenset(int(label) for label in meta["tombstones"])
+            labels, texts, attributes = meta["labels"], meta["texts"], meta["attributes"]
+            next_label, trained_size = meta["next_label"], meta["trained_size"]
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"Ignoring unreadable index snapshot {meta_path}: {e}")
+            return False
+
+        delta_size = 0 if delta_labels is None else len(delta_labels)
+        if index.ntotal - len(tombstones) + delta_size != len(labels) or texts.keys() != labels.keys():
+            return False
+        if delta_vectors is not None and delta_vectors.shape[1:] != (self.dimension,):
+            return False
+        vector_index.configure_search(index, self.index_config)
+        label_by_id = {skill_id: int(label) for skill_id, label in labels.items()}
+        # Writers always copy before mutating, so the read-only mapping can be published as is
+        with self._write_lock:
+            self._publish(
+                index=index,
+                texts=texts,
+                label_by_id=label_by_id,
+                id_by_label={label: skill_id for skill_id, label in label_by_id.items()},
+                next_label=next_label,
+                trained_size=trained_size,
+                degraded_ids=frozenset(),
+                mmapped=True,
+                attributes=attributes,
+                tombstones=tombstones,
+                index_key=meta["index_file"].removeprefix(f"{name}.").removesuffix(".faiss"),
+                **self._delta_changes(delta_vectors, delta_labels),
+            )
+        return True
+
+    def recall_report(self, k: int = 10, sample_size: int = 100, index_types: Optional[List[str]] = None) -> List[dict]:
+        """Recall@k and latency of each index backend against the exact flat baseline, on the indexed vectors."""
+        vectors = self.get_embeddings(list(self._current.texts.values()))
+        return vector_index.recall_report(vectors, self.index_config, k=k, sample_size=sample_size, index_types=index_types)
 
     def remove_all(self):
-        self.index = faiss.IndexFlatL2(self.dimension)
-        self.skill_ids = []
+        with self._write_lock:
+            self._current = self._empty_generation(self._current.number + 1)
 
 # Global instance
 vector_store = VectorStore()
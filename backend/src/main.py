@@ -20,11 +20,37 @@ app.add_middleware(
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/metrics/embeddings")
+async def embedding_metrics():
+    from src.core.embedding_cache import embedding_cache, query_embedding_cache
+    return {
+        "document_cache": embedding_cache.stats(),
+        "query_cache": query_embedding_cache.stats()
+    }
+
 @app.on_event("startup")
 async def startup_event():
     from src.services.session_registry import session_registry
     import asyncio
     asyncio.create_task(session_registry.start_cleanup_task())
+    # Spawn MCP servers and index tools once, before the first session needs them
+    from src.services.tool_service import ToolService
+    await ToolService().load_registry()
+    # Pre-fork the code_execution workers so the first call does not pay their start-up
+    from src.core.sandbox import sandbox_pool
+    try:
+        await sandbox_pool.start()
+    except Exception as e:
+        print(f"Warning: sandbox pool failed to start, retrying on first use: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from src.core.sandbox import sandbox_pool
+    from src.core.http_pool import http_pool
+    from src.services.tool_service import ToolService
+    await sandbox_pool.close()
+    await ToolService().shutdown()
+    await http_pool.close()
 
 from src.api.registration_router import router as registration_router
 from src.api.execution_router import router as execution_router
@@ -22,6 +22,7 @@ class Skill(BaseModel):
     complexity: Complexity
     version: str
     source_url: str
+    tags: List[str] = []
     last_synced: datetime = Field(default_factory=datetime.now)
     created_at: datetime = Field(default_factory=datetime.now)
 
@@ -46,6 +47,15 @@ class SkillDocumentation(BaseModel):
     content: str
     file_name: str
 
+class SkillMatch(BaseModel):
+    skill: Skill
+    distance: Optional[float] = None
+    passes_threshold: bool
+
+class BatchSearchResult(BaseModel):
+    query: str
+    matches: List[SkillMatch] = []
+
 class SkillRegistry(BaseModel):
     skills: List[Skill] = []
     last_updated: datetime = Field(default_factory=datetime.now)
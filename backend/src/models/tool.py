@@ -16,6 +16,13 @@ class ToolDefinition(BaseModel):
     output_schema: Optional[Dict[str, Any]] = Field(None, description="JSON Schema for outputs")
     parallel_capable: bool = False
     timeout: Optional[int] = Field(30, description="Execution timeout in seconds")
+    cacheable: bool = Field(False, description="Cache results keyed by the canonicalized input args")
+    ttl_seconds: int = Field(300, description="Lifetime of a cached result")
+    max_entries: int = Field(256, description="Cached results kept for this tool")
+    max_concurrency: Optional[int] = Field(None, description="Calls of this tool allowed to run at once (None = unlimited)")
+    max_queue: Optional[int] = Field(None, description="Calls allowed to wait for a slot before new ones are rejected (None = unlimited)")
+    breaker_failure_threshold: int = Field(5, description="Consecutive failures that open the circuit breaker (0 = never)")
+    breaker_reset_seconds: float = Field(30, description="How long an open breaker fails fast before a trial call")
     config: Dict[str, Any] = Field(default_factory=dict, description="Type-specific configuration")
 
 class ExecutionStatus(str, Enum):
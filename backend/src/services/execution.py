@@ -98,10 +98,7 @@ class ExecutionService:
 
         # 2. Setup Tools (Always include RequestInputTool for HITL)
         from src.services.tool_service import ToolService
-        tool_service = ToolService()
-        await tool_service.load_registry()
-        
-        tools = [RequestInputTool()] + tool_service.get_langchain_tools()
+        tools = await ToolService().agent_tools(session.history[0].content, [RequestInputTool()])
         
         # 3. Choose LLM based on Complexity
         if skill.complexity == Complexity.COMPLEX:
@@ -150,7 +147,7 @@ class ExecutionService:
         start_time = time.time()
         
         # 1. Search
-        skill, distance = search_service.find_best_skill(query)
+        skill, distance = await search_service.afind_best_skill(query)
         
         if not skill:
             duration = time.time() - start_time
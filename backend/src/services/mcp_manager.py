@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+logger = logging.getLogger(__name__)
+
+# (server_name, server config) -> async context manager yielding an initialized session
+SessionFactory = Callable[[str, Dict[str, Any]], AsyncContextManager[Any]]
+
+@asynccontextmanager
+async def stdio_session(server_name: str, cfg: Dict[str, Any]):
+    """Spawn the server from its mcp.json entry and yield an initialized ClientSession."""
+    params = StdioServerParameters(
+        command=cfg["command"],
+        args=cfg.get("args", []),
+        env={**os.environ, **cfg.get("env", {})}
+    )
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+class MCPConnection:
+    """One server process and its session.
+
+    The transport and session contexts are entered and exited by a single owner task,
+    as anyio requires; ``close`` just signals that task and waits for it.
+    """
+
+    def __init__(self, server_name: str, cfg: Dict[str, Any], factory: SessionFactory):
+        self.server_name = server_name
+        self.cfg = cfg
+        self.factory = factory
+        self.session: Optional[Any] = None
+        self.in_flight = 0
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def open(self, timeout: float):
+        self._task = asyncio.create_task(self._own())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise ConnectionError(f"MCP server {self.server_name} did not initialize within {timeout}s")
+        if self.session is None:
+            await self.close()
+            raise ConnectionError(f"MCP server {self.server_name} failed to start: {self._error}")
+
+    async def _own(self):
+        try:
+            async with self.factory(self.server_name, self.cfg) as session:
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            if self.session is not None:
+                logger.warning(f"MCP connection to {self.server_name} lost: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def close(self, timeout: float = 5):
+        self._stop.set()
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        except Exception:
+            pass
+
+class MCPSessionManager:
+    """Pools of MCP server connections with health checks and automatic reconnects.
+
+    Each configured server keeps ``pool_size`` processes (mcp.json ``pool_size`` or
+    MCP_POOL_SIZE). Calls go to the least-busy live connection; a ClientSession
+    multiplexes concurrent requests itself. A supervisor task per server pings every
+    connection and replaces dead ones with exponential backoff.
+    """
+
+    def __init__(self, factory: Optional[SessionFactory] = None, pool_size: Optional[int] = None, ping_interval: Optional[float] = None, ping_timeout: Optional[float] = None, connect_timeout: Optional[float] = None, max_backoff: Optional[float] = None):
+        self.factory = factory or stdio_session
+        self.pool_size = max(1, pool_size or int(os.getenv("MCP_POOL_SIZE", "1")))
+        self.ping_interval = ping_interval or float(os.getenv("MCP_PING_INTERVAL_SECONDS", "30"))
+        self.ping_timeout = ping_timeout or float(os.getenv("MCP_PING_TIMEOUT_SECONDS", "5"))
+        self.connect_timeout = connect_timeout or float(os.getenv("MCP_CONNECT_TIMEOUT_SECONDS", "30"))
+        self.max_backoff = max_backoff or float(os.getenv("MCP_MAX_BACKOFF_SECONDS", "30"))
+        self.servers: Dict[str, Dict[str, Any]] = {}
+        self._pools: Dict[str, List[MCPConnection]] = {}
+        self._supervisors: Dict[str, asyncio.Task] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._restarts: Dict[str, int] = {}
+        # Called with the server name after (re)connecting, e.g. to refresh discovered tools
+        self.on_connect: Optional[Callable[[str], Any]] = None
+
+    def _size_of(self, server_name: str) -> int:
+        return max(1, int(self.servers[server_name].get("pool_size", self.pool_size)))
+
+    async def configure(self, servers: Dict[str, Dict[str, Any]]):
+        """Start new servers, restart changed ones and stop removed ones. Unchanged servers are left alone."""
+        for server_name in list(self.servers):
+            if servers.get(server_name) != self.servers[server_name]:
+                await self._stop_server(server_name)
+        added = [name for name in servers if name not in self.servers]
+        for server_name in added:
+            self.servers[server_name] = servers[server_name]
+            self._pools[server_name] = []
+            self._wakeups[server_name] = asyncio.Event()
+            self._locks[server_name] = asyncio.Lock()
+            self._restarts.setdefault(server_name, 0)
+        # Eager start: processes are warm before the first tool call
+        await asyncio.gather(*(self._fill(server_name) for server_name in added))
+        for server_name in added:
+            self._supervisors[server_name] = asyncio.create_task(self._supervise(server_name))
+
+    async def _fill(self, server_name: str) -> bool:
+        """Open connections until the pool is full. Returns False if any connect failed."""
+        async with self._locks[server_name]:
+            pool = self._pools[server_name]
+            pool[:] = [conn for conn in pool if conn.alive]
+            missing = self._size_of(server_name) - len(pool)
+            if missing <= 0:
+                return True
+            conns = [MCPConnection(server_name, self.servers[server_name], self.factory) for _ in range(missing)]
+            results = await asyncio.gather(*(conn.open(self.connect_timeout) for conn in conns), return_exceptions=True)
+            ok = True
+            for conn, result in zip(conns, results):
+                if isinstance(result, BaseException):
+                    ok = False
+                    logger.warning(f"MCP connect to {server_name} failed: {result}")
+                else:
+                    pool.append(conn)
+            connected = missing - sum(isinstance(result, BaseException) for result in results)
+        if connected and self.on_connect:
+            try:
+                await self.on_connect(server_name)
+            except Exception as e:
+                logger.error(f"MCP on_connect hook failed for {server_name}: {e}")
+        return ok
+
+    async def _check(self, server_name: str) -> bool:
+        """Ping every connection, drop unhealthy ones and refill. Returns True when the pool is healthy."""
+        for conn in list(self._pools[server_name]):
+            healthy = conn.alive
+            if healthy:
+                try:
+                    await asyncio.wait_for(conn.session.send_ping(), timeout=self.ping_timeout)
+                except Exception as e:
+                    logger.warning(f"MCP ping to {server_name} failed: {e}")
+                    healthy = False
+            if not healthy:
+                self._pools[server_name].remove(conn)
+                self._restarts[server_name] += 1
+                await conn.close()
+        return await self._fill(server_name)
+
+    async def _supervise(self, server_name: str):
+        failures = 0
+        wakeup = self._wakeups[server_name]
+        while True:
+            delay = self.ping_interval if failures == 0 else min(self.max_backoff, 2 ** (failures - 1))
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            try:
+                failures = 0 if await self._check(server_name) else failures + 1
+            except Exception as e:
+                failures += 1
+                logger.error(f"MCP supervisor error for {server_name}: {e}")
+
+    async def acquire(self, server_name: str) -> MCPConnection:
+        """The least-busy live connection, connecting on demand if the pool is empty."""
+        if server_name not in self.servers:
+            raise ValueError(f"MCP server {server_name} not configured")
+        live = [conn for conn in self._pools[server_name] if conn.alive]
+        if not live:
+            # The lock makes concurrent first calls share one connect
+            await self._fill(server_name)
+            live = [conn for conn in self._pools[server_name] if conn.alive]
+            if not live:
+                raise ConnectionError(f"MCP server {server_name} is unavailable")
+        return min(live, key=lambda conn: conn.in_flight)
+
+    async def call_tool(self, server_name: str, tool_name: str, args: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        conn = await self.acquire(server_name)
+        conn.in_flight += 1
+        try:
+            return await asyncio.wait_for(conn.session.call_tool(tool_name, args), timeout=timeout)
+        except Exception:
+            if not conn.alive:
+                self._wakeups[server_name].set()
+            raise
+        finally:
+            conn.in_flight -= 1
+
+    async def list_tools(self, server_name: str) -> List[Any]:
+        conn = await self.acquire(server_name)
+        result = await conn.session.list_tools()
+        return list(result.tools)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            server_name: {
+                "pool_size": self._size_of(server_name),
+                "alive": sum(conn.alive for conn in pool),
+                "in_flight": sum(conn.in_flight for conn in pool),
+                "restarts": self._restarts.get(server_name, 0),
+            }
+            for server_name, pool in self._pools.items()
+        }
+
+    async def _stop_server(self, server_name: str):
+        supervisor = self._supervisors.pop(server_name, None)
+        if supervisor:
+            supervisor.cancel()
+            try:
+                await supervisor
+            except (asyncio.CancelledError, Exception):
+                pass
+        pool = self._pools.pop(server_name, [])
+        await asyncio.gather(*(conn.close() for conn in pool))
+        self.servers.pop(server_name, None)
+        self._wakeups.pop(server_name, None)
+        self._locks.pop(server_name, None)
+
+    async def close(self):
+        """Stop supervisors and shut every server process down."""
+        for server_name in list(self.servers):
+            await self._stop_server(server_name)
@@ -245,6 +245,10 @@ class RegistrationService:
                 # Here we just proceed if we reached this point (bypass_security is usually True for approvals)
                 pass
 
+        tags = metadata.get("tags") or []
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+
         skill_id = uuid4()
         skill_dir = self.storage_dir / str(skill_id)
         skill_dir.mkdir(parents=True, exist_ok=True)
@@ -258,10 +262,11 @@ class RegistrationService:
             code_path=str(skill_dir / code_file.name),
             complexity=Complexity(metadata.get("complexity", "SIMPLE").upper()),
             version=metadata.get("version", "1.0.0"),
-            source_url=url if self._is_github_url(url) else f"file://{url}"
+            source_url=url if self._is_github_url(url) else f"file://{url}",
+            tags=[str(tag) for tag in tags]
         )
 
-        registry_service.add_skill(skill)
+        await registry_service.aadd_skill(skill)
         return skill
 
     async def register_from_url(self, url: str) -> Skill:
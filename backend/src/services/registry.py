@@ -1,10 +1,14 @@
+import asyncio
 import json
 import os
-from typing import Optional
+import yaml
+from typing import Dict, List, Optional
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urlparse
 from src.models import Skill, SkillRegistry, SkillDocumentation
 from src.core.vector_store import vector_store
+from src.core.lexical_index import lexical_index
 
 class RegistryService:
     def __init__(self, registry_path: str = ".skills/registry.json"):
@@ -37,28 +41,133 @@ class RegistryService:
             self.registry = SkillRegistry()
             self._save_registry()
         
-        # Re-index skills in vector store
-        vector_store.remove_all()
-        for skill in self.registry.skills:
-            vector_store.add_skill(str(skill.id), f"{skill.name} {skill.description}")
+        # Reuse the persisted lexical texts when they match this registry version; building them
+        # from scratch reads and parses every skill's SKILL.md
+        self._lexical_texts = self._load_lexical_texts()
+        if self._lexical_texts.keys() != {str(skill.id) for skill in self.registry.skills}:
+            self._lexical_texts = {str(skill.id): self._lexical_text(skill) for skill in self.registry.skills}
+            self._save_lexical_texts()
+        lexical_index.clear()
+        for skill_id, text in self._lexical_texts.items():
+            lexical_index.upsert(skill_id, text)
+
+        # Reuse the on-disk index snapshot when it matches this registry version
+        if vector_store.load_snapshot(self.registry_path.parent, self._index_version()):
+            print(f"Loaded skill index snapshot ({len(vector_store.skill_ids)} skills)")
+            return
+
+        # Re-index skills off to the side; searches see the previous index until the swap
+        vector_store.replace_all(
+            [str(skill.id) for skill in self.registry.skills],
+            [self._index_text(skill) for skill in self.registry.skills],
+            [self.skill_attributes(skill) for skill in self.registry.skills]
+        )
+        print(f"Indexed {len(self.registry.skills)} skills (embedding cache: {vector_store.cache_stats()})")
+        self._save_index_snapshot()
+
+    def _index_version(self) -> str:
+        return self.registry.last_updated.isoformat()
+
+    def _lexical_texts_path(self) -> Path:
+        return self.registry_path.parent / "lexical_texts.json"
+
+    def _load_lexical_texts(self) -> Dict[str, str]:
+        try:
+            data = json.loads(self._lexical_texts_path().read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Ignoring unreadable lexical texts {self._lexical_texts_path()}: {e}")
+            return {}
+        return data["texts"] if data.get("version") == self._index_version() else {}
+
+    def _save_index_snapshot(self):
+        """Persist the vector index snapshot and the lexical texts next to the registry."""
+        try:
+            if not vector_store.save_snapshot(self.registry_path.parent, self._index_version()):
+                print("Skill index snapshot skipped: some embeddings failed")
+        except Exception as e:
+            print(f"Warning: failed to save skill index snapshot: {e}")
+        self._save_lexical_texts()
+
+    def _save_lexical_texts(self):
+        try:
+            path = self._lexical_texts_path()
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps({"version": self._index_version(), "texts": self._lexical_texts}), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Warning: failed to save lexical texts: {e}")
+
+    @staticmethod
+    def _index_text(skill: Skill) -> str:
+        return f"{skill.name} {skill.description}"
+
+    @staticmethod
+    def skill_attributes(skill: Skill) -> Dict[str, List[str]]:
+        """Filterable metadata for vector search (see SearchService filters)."""
+        return {
+            "complexity": [skill.complexity.value],
+            "version": [skill.version],
+            "source": [source_repo(skill.source_url)],
+            "tag": list(skill.tags),
+        }
+
+    def _lexical_text(self, skill: Skill) -> str:
+        """Name, description and every string value in the SKILL.md front-matter."""
+        parts = [skill.name, skill.description]
+        doc_path = self._find_documentation_path(skill)
+        if doc_path:
+            try:
+                content = doc_path.read_text(encoding="utf-8")
+                if content.startswith("---"):
+                    front_matter = content.split("---", 2)[1]
+                    parts.extend(_flatten_strings(yaml.safe_load(front_matter)))
+            except Exception as e:
+                print(f"Skipping front-matter for skill {skill.id}: {e}")
+        return " ".join(parts)
 
     def _save_registry(self):
         with open(self.registry_path, "w") as f:
             f.write(self.registry.model_dump_json(indent=2))
 
     def add_skill(self, skill: Skill):
+        self._store_skill(skill)
+        vector_store.upsert(str(skill.id), self._index_text(skill), self.skill_attributes(skill))
+        self._save_index_snapshot()
+
+    async def aadd_skill(self, skill: Skill):
+        """Async add_skill for request handlers; the embedding call does not block the event loop."""
+        self._store_skill(skill)
+        await vector_store.aupsert(str(skill.id), self._index_text(skill), self.skill_attributes(skill))
+        await asyncio.to_thread(self._save_index_snapshot)
+
+    def _store_skill(self, skill: Skill):
         # Remove existing if ID matches (update)
         self.registry.skills = [s for s in self.registry.skills if s.id != skill.id]
         self.registry.skills.append(skill)
         self.registry.last_updated = datetime.now()
         self._save_registry()
-        vector_store.add_skill(str(skill.id), f"{skill.name} {skill.description}")
+        self._lexical_texts[str(skill.id)] = self._lexical_text(skill)
+        lexical_index.upsert(str(skill.id), self._lexical_texts[str(skill.id)])
 
     def remove_skill(self, skill_id: str):
+        self._drop_skill(skill_id)
+        vector_store.remove(skill_id)
+        self._save_index_snapshot()
+
+    async def aremove_skill(self, skill_id: str):
+        """Async remove_skill for request handlers; index writes and the snapshot run off the event loop."""
+        self._drop_skill(skill_id)
+        await vector_store.aremove_many([skill_id])
+        await asyncio.to_thread(self._save_index_snapshot)
+
+    def _drop_skill(self, skill_id: str):
         self.registry.skills = [s for s in self.registry.skills if str(s.id) != skill_id]
         self.registry.last_updated = datetime.now()
         self._save_registry()
-        self._load_registry() # Simple way to re-index everything
+        self._lexical_texts.pop(skill_id, None)
+        lexical_index.remove(skill_id)
 
     def get_skill(self, skill_id: str) -> Optional[Skill]:
         for skill in self.registry.skills:
@@ -66,25 +175,30 @@ class RegistryService:
                 return skill
         return None
 
+    def _find_documentation_path(self, skill: Skill) -> Optional[Path]:
+        # metadata_path should be relative to workspace root or absolute
+        # We assume it is a valid path string that can be resolved
+        skill_dir = Path(skill.metadata_path).parent
+        for filename in ["SKILL.md", "skill.md"]:
+            doc_path = skill_dir / filename
+            if doc_path.exists():
+                return doc_path
+        return None
+
     def read_documentation(self, skill_id: str) -> Optional[SkillDocumentation]:
         skill = self.get_skill(skill_id)
         if not skill:
             return None
             
         try:
-            # metadata_path should be relative to workspace root or absolute
-            # We assume it is a valid path string that can be resolved
-            skill_dir = Path(skill.metadata_path).parent
-            
-            for filename in ["SKILL.md", "skill.md"]:
-                doc_path = skill_dir / filename
-                if doc_path.exists():
-                    content = doc_path.read_text(encoding="utf-8")
-                    return SkillDocumentation(
-                        skill_id=skill.id,
-                        content=content,
-                        file_name=filename
-                    )
+            doc_path = self._find_documentation_path(skill)
+            if doc_path:
+                content = doc_path.read_text(encoding="utf-8")
+                return SkillDocumentation(
+                    skill_id=skill.id,
+                    content=content,
+                    file_name=doc_path.name
+                )
         except Exception as e:
             print(f"Error reading documentation for skill {skill_id}: {e}")
             
@@ -93,4 +207,22 @@ class RegistryService:
     def list_skills(self) -> SkillRegistry:
         return self.registry
 
+def source_repo(source_url: str) -> str:
+    """"owner/repo" for GitHub URLs, otherwise the source URL itself."""
+    parsed = urlparse(source_url)
+    if parsed.netloc.endswith("github.com"):
+        parts = [part for part in parsed.path.split("/") if part]
+        if len(parts) >= 2:
+            return f"{parts[0]}/{parts[1].removesuffix('.git')}"
+    return source_url
+
+def _flatten_strings(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _flatten_strings(item)]
+    if isinstance(value, list):
+        return [text for item in value for text in _flatten_strings(item)]
+    return []
+
 registry_service = RegistryService()
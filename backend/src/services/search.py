@@ -1,26 +1,90 @@
 import os
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from src.core.vector_store import vector_store
+from src.core.lexical_index import lexical_index, fuse_rankings
 from src.services.registry import registry_service
-from src.models import Skill
+from src.models import Skill, SkillMatch, BatchSearchResult
 
 class SearchService:
     def __init__(self):
         self.threshold = float(os.getenv("MIN_CONFIDENCE_THRESHOLD", "0.5"))
+        # Normalized BM25 score (0-1) a lexical-only match needs to be accepted
+        self.lexical_threshold = float(os.getenv("MIN_LEXICAL_SCORE", "0.3"))
+        self.candidates = int(os.getenv("HYBRID_SEARCH_CANDIDATES", "10"))
 
-    def find_best_skill(self, query: str) -> Tuple[Optional[Skill], Optional[float]]:
-        results = vector_store.search(query, top_k=1)
-        if not results:
+    def find_best_skill(self, query: str, filters: Optional[Dict[str, List[str]]] = None) -> Tuple[Optional[Skill], Optional[float]]:
+        """Hybrid lexical + vector search.
+
+        Returns the best skill and its L2 distance. The distance is None when the match
+        came from the lexical index alone (e.g. the embedding service is down).
+        ``filters`` (e.g. {"complexity": ["SIMPLE"], "tag": ["pdf"]}) are applied inside the vector search.
+        """
+        vector_results = vector_store.search(query, top_k=self.candidates, filters=filters)
+        return self._pick_best(query, vector_results, filters)
+
+    async def afind_best_skill(self, query: str, filters: Optional[Dict[str, List[str]]] = None) -> Tuple[Optional[Skill], Optional[float]]:
+        """Async find_best_skill; the query embedding does not block the event loop."""
+        vector_results = await vector_store.asearch(query, top_k=self.candidates, filters=filters)
+        return self._pick_best(query, vector_results, filters)
+
+    def _lexical_search(self, query: str, top_k: int, filters: Optional[Dict[str, List[str]]]) -> List[Tuple[str, float]]:
+        if not filters:
+            return lexical_index.search(query, top_k=top_k)
+        # BM25 has no ID selector; over-fetch and filter on the registry attributes
+        results = []
+        for skill_id, score in lexical_index.search(query, top_k=top_k * 5):
+            skill = registry_service.get_skill(skill_id)
+            if skill and _matches(registry_service.skill_attributes(skill), filters):
+                results.append((skill_id, score))
+        return results[:top_k]
+
+    def _pick_best(self, query: str, vector_results: List[Tuple[str, float]], filters: Optional[Dict[str, List[str]]] = None) -> Tuple[Optional[Skill], Optional[float]]:
+        lexical_results = self._lexical_search(query, self.candidates, filters)
+        if not vector_results and not lexical_results:
             return None, None
-            
-        skill_id, distance = results[0]
-        
-        # In FAISS L2, smaller distance means higher confidence.
-        # We need to calibrate the threshold based on the embedding model.
-        if distance > self.threshold:
-            return None, distance
-            
-        skill = registry_service.get_skill(skill_id)
-        return skill, distance
+
+        distances = dict(vector_results)
+        lexical_scores = dict(lexical_results)
+        ranking = fuse_rankings(vector_results, lexical_results)
+
+        # Fusion can rank a skill found by both indexes at middling ranks above the vector
+        # top-1, so take the best-fused candidate that clears either threshold.
+        for skill_id in ranking:
+            distance = distances.get(skill_id)
+            # In FAISS L2, smaller distance means higher confidence.
+            # We need to calibrate the threshold based on the embedding model.
+            vector_match = distance is not None and distance <= self.threshold
+            lexical_match = lexical_scores.get(skill_id, 0.0) >= self.lexical_threshold
+            if vector_match or lexical_match:
+                return registry_service.get_skill(skill_id), distance
+        return None, distances.get(ranking[0])
+
+    async def search(self, query: str, top_k: int = 1, filters: Optional[Dict[str, List[str]]] = None) -> List[SkillMatch]:
+        return (await self.search_batch([query], top_k=top_k, filters=filters))[0].matches
+
+    async def search_batch(self, queries: List[str], top_k: int = 1, filters: Optional[Dict[str, List[str]]] = None) -> List[BatchSearchResult]:
+        """Top-k matches per query from one batched embedding pass and one matrix FAISS search.
+
+        Queries that got no vector results (embedding unavailable) fall back to lexical matches.
+        """
+        vector_results = await vector_store.asearch_many(queries, top_k=top_k, filters=filters)
+        results = []
+        for query, hits in zip(queries, vector_results):
+            matches = []
+            if hits:
+                for skill_id, distance in hits:
+                    skill = registry_service.get_skill(skill_id)
+                    if skill:
+                        matches.append(SkillMatch(skill=skill, distance=distance, passes_threshold=distance <= self.threshold))
+            else:
+                for skill_id, score in self._lexical_search(query, top_k, filters):
+                    skill = registry_service.get_skill(skill_id)
+                    if skill:
+                        matches.append(SkillMatch(skill=skill, passes_threshold=score >= self.lexical_threshold))
+            results.append(BatchSearchResult(query=query, matches=matches))
+        return results
+
+def _matches(attributes: Dict[str, List[str]], filters: Dict[str, List[str]]) -> bool:
+    return all(value in attributes.get(attribute, []) for attribute, values in filters.items() for value in values)
 
 search_service = SearchService()
@@ -1,33 +1,76 @@
 import json
 import asyncio
+import functools
+import hashlib
 import importlib.util
+import inspect
 import logging
 import os
-from typing import List, Dict, Any, Optional, Type, Tuple, Callable
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType, ModuleType
+from typing import List, Dict, Any, Optional, Type, Tuple, Callable, Iterable, Mapping
 from pathlib import Path
 import aiofiles
 from pydantic import ValidationError
 import faiss
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from uuid import UUID
 
 from langchain.tools import BaseTool
 
 # MCP Client Imports
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import ClientSession
 
 from src.models.tool import ToolDefinition, ToolType, ToolResponse, ExecutionStatus, ToolExecutionLog
 from src.core.vector_store import VectorStore
+from src.core.result_cache import ToolResultCache
+from src.core.tool_guard import ToolGuards, ToolRejected
+from src.core.log_writer import AsyncLogWriter, truncate_payload
+from src.core.http_pool import ToolContext, http_pool
+from src.core.schema_validation import compile_validator
+from src.services.mcp_manager import MCPSessionManager
 
 logger = logging.getLogger(__name__)
 
+def _is_successful_response(response: ToolResponse) -> bool:
+    # Local tools report soft failures (e.g. an upstream API error) as {"error": ...}
+    return response.status == ExecutionStatus.SUCCESS and not (isinstance(response.data, dict) and "error" in response.data)
+
+def _is_tool_healthy(response: ToolResponse) -> bool:
+    """Breaker predicate: errors flagged ``"caller_error": true`` (bad input, a failing snippet) are normal results, not outages."""
+    if _is_successful_response(response):
+        return True
+    return response.status == ExecutionStatus.SUCCESS and bool(response.data.get("caller_error"))
+
+@functools.lru_cache(maxsize=256)
+def _accepts_context(func: Callable) -> bool:
+    """Whether a local tool entrypoint takes a second positional argument for its ToolContext."""
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return len([p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]) >= 2
+
+@dataclass(frozen=True)
+class ToolRegistrySnapshot:
+    """Immutable view of every registered tool (local and discovered MCP), swapped as a whole on change."""
+    version: int = 0
+    tools: Mapping[str, ToolDefinition] = field(default_factory=lambda: MappingProxyType({}))
+    # Compiled input_schema validators; tools whose schema does not compile have none
+    validators: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+
+ConfigSignature = Tuple[Optional[Tuple[int, int]], ...]
+
 class DynamicLocalTool(BaseTool):
     """LangChain wrapper for local Python script tools."""
     name: str
     description: str
     tool_def: ToolDefinition
+    # Compiled input_schema validator from the registry snapshot; checked by the agent loop
+    validator: Optional[Any] = None
     
     def _run(self, *args, **kwargs) -> Any:
         """Synchronous run not supported, use _arun."""
@@ -47,13 +90,17 @@ class MCPToolWrapper(BaseTool):
     name: str
     description: str
     server_name: str
+    # Name on the MCP server; ``name`` is qualified with the server name
+    tool_name: str
+    tool_def: ToolDefinition
+    validator: Optional[Any] = None
     
     def _run(self, *args, **kwargs) -> Any:
         raise NotImplementedError("MCPToolWrapper only supports async execution")
 
     async def _arun(self, **kwargs) -> Any:
         service = ToolService()
-        return await service.call_mcp_tool(self.server_name, self.name, kwargs)
+        return await service.call_mcp_tool(self.server_name, self.tool_name, kwargs)
 
 class ToolService:
     _instance = None
@@ -76,40 +123,76 @@ class ToolService:
 
         self.tools_config_path = Path(tools_config_path) if tools_config_path else base_dir / "src/tools/tools.json"
         self.mcp_config_path = Path(mcp_config_path) if mcp_config_path else base_dir / "src/tools/mcp.json"
-        self.log_file_path = base_dir / "logs/tools.log"
+        # Execution log lines are queued and written in batches by a background task
+        self.log_writer = AsyncLogWriter(base_dir / "logs/tools.log")
+        self.log_max_field_chars = int(os.getenv("TOOL_LOG_MAX_FIELD_CHARS", "4096"))
         
         self.tools: Dict[str, ToolDefinition] = {}
         self.mcp_servers: Dict[str, Dict[str, Any]] = {}
-        self.mcp_sessions: Dict[str, ClientSession] = {}
+        self.mcp_manager = MCPSessionManager()
+        # Tools discovered on MCP servers, keyed by "<server>.<tool>", and a schema hash per server
+        self.mcp_tools: Dict[str, ToolDefinition] = {}
+        self._mcp_fingerprints: Dict[str, str] = {}
+        self.mcp_manager.on_connect = self._discover_mcp_tools
+        # Readers (sessions, the API) only ever see a published snapshot
+        self.snapshot = ToolRegistrySnapshot()
+        # (mtime_ns, size) of tools.json and mcp.json at the last load; None until loaded
+        self._config_signature: Optional[ConfigSignature] = None
+        self._registry_lock = asyncio.Lock()
+        self.registry_check_interval = float(os.getenv("TOOL_REGISTRY_CHECK_SECONDS", "2"))
+        # Results of tools declared "cacheable" in tools.json / mcp.json
+        self.result_cache = ToolResultCache()
+        # Per-tool concurrency limits and circuit breakers (ToolDefinition max_concurrency / breaker_*)
+        self.guards = ToolGuards()
         
         self.update_queue = asyncio.Queue()
-        self.vector_store = VectorStore(dimension=3072)
+        self.vector_store = VectorStore()
         self.tool_names_in_index: List[str] = []
+        # Per-query tool selection for agent prompts (AGENT_TOOL_TOP_K=0 offers every tool)
+        self.tool_top_k = int(os.getenv("AGENT_TOOL_TOP_K", "8"))
+        self.pinned_tools = [name.strip() for name in os.getenv("AGENT_PINNED_TOOLS", "request_human_input").split(",") if name.strip()]
+
+        # Loaded local tool modules: script path -> ((mtime_ns, size), module, last stat time)
+        self._module_cache: Dict[str, Tuple[Tuple[int, int], ModuleType, float]] = {}
+        # Scripts are re-stat'ed at most this often, so hot calls are a dict lookup
+        self.module_check_interval = float(os.getenv("LOCAL_TOOL_RELOAD_CHECK_SECONDS", "1"))
+        # Sync entrypoints run here instead of on the event loop
+        self._executor = ThreadPoolExecutor(max_workers=int(os.getenv("LOCAL_TOOL_THREADS", "8")), thread_name_prefix="local-tool")
         
         self._initialized = True
         asyncio.create_task(self._update_worker())
         asyncio.create_task(self._cleanup_logs_task())
+        asyncio.create_task(self._watch_registry_task())
 
     def reset_for_test(self):
         """Reset the singleton state for testing purposes."""
         self.tools = {}
         self.mcp_servers = {}
-        self.mcp_sessions = {}
+        self.mcp_manager = MCPSessionManager()
+        self.mcp_manager.on_connect = self._discover_mcp_tools
+        self.mcp_tools = {}
+        self._mcp_fingerprints = {}
+        self.snapshot = ToolRegistrySnapshot()
+        self._config_signature = None
+        self.result_cache = ToolResultCache()
+        self.guards = ToolGuards()
+        self._module_cache = {}
         self.vector_store.remove_all()
         self.tool_names_in_index = []
 
+    @property
+    def log_file_path(self) -> Path:
+        return self.log_writer.path
+
+    @log_file_path.setter
+    def log_file_path(self, path: Path):
+        self.log_writer.path = Path(path)
+
     async def _cleanup_logs_task(self):
-        """Daily log rotation and retention per FR-016."""
+        """Daily log retention per FR-016. Rotation itself happens in the log writer."""
         while True:
             try:
-                log_dir = Path("backend/logs")
-                if log_dir.exists():
-                    retention_days = 30
-                    cutoff = datetime.now() - timedelta(days=retention_days)
-                    for log_file in log_dir.glob("tools.log.*"):
-                        if datetime.fromtimestamp(log_file.stat().st_mtime) < cutoff:
-                            log_file.unlink()
-                            logger.info(f"Deleted old log file: {log_file}")
+                await asyncio.to_thread(self.log_writer.prune)
             except Exception as e:
                 logger.error(f"Log cleanup error: {e}")
             await asyncio.sleep(86400) # Check daily
@@ -130,111 +213,320 @@ class ToolService:
         await self.update_queue.put((update_fn, future))
         return await future
 
+    def _read_config_signature(self) -> ConfigSignature:
+        signature = []
+        for path in (self.tools_config_path, self.mcp_config_path):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    async def _watch_registry_task(self):
+        """Reload the registry when tools.json or mcp.json change on disk."""
+        while True:
+            await asyncio.sleep(self.registry_check_interval)
+            try:
+                await self.refresh_registry()
+            except Exception as e:
+                # A broken edit must not take the server down; the last good snapshot keeps serving
+                logger.error(f"Tool registry reload failed, keeping version {self.snapshot.version}: {e}")
+
+    async def refresh_registry(self) -> bool:
+        """Reload if the config files changed since the last load. Returns True if it reloaded."""
+        if self._config_signature is None or await asyncio.to_thread(self._read_config_signature) == self._config_signature:
+            return False
+        logger.info("Tool registry config changed, reloading")
+        await self._load_registry()
+        return True
+
+    async def ensure_registry(self) -> ToolRegistrySnapshot:
+        """The current snapshot, loading the registry first if it never was. No I/O once loaded."""
+        if self._config_signature is None:
+            await self.load_registry()
+        return self.snapshot
+
     async def load_registry(self):
         """Load both local and MCP tool definitions."""
         try:
+            await self._load_registry()
+        except Exception as e:
+            logger.critical(f"Critical error loading tool registry: {e}", exc_info=True)
+            raise SystemExit(f"Halt: Registry failure {e}")
+
+    async def _load_registry(self):
+        async with self._registry_lock:
+            # Taken before reading, so an edit made while loading triggers another reload
+            signature = await asyncio.to_thread(self._read_config_signature)
+            tools = self.tools
+            mcp_servers = self.mcp_servers
+
             # 1. Local Tools
             if self.tools_config_path.exists():
                 async with aiofiles.open(self.tools_config_path, mode='r') as f:
                     data = json.loads(await f.read())
-                    new_tools = {}
+                    tools = {}
                     for tool_data in data.get("tools", []):
                         tool = ToolDefinition(**tool_data)
-                        new_tools[tool.name] = tool
-                    self.tools = new_tools
+                        tools[tool.name] = tool
 
             # 2. MCP Servers
             if self.mcp_config_path.exists():
                 async with aiofiles.open(self.mcp_config_path, mode='r') as f:
                     data = json.loads(await f.read())
-                    self.mcp_servers = data.get("mcp_servers", {})
-            
+                    mcp_servers = data.get("mcp_servers", {})
+
+            # Both files parsed: only now replace the live state
+            self.tools = tools
+            self.mcp_servers = mcp_servers
+            await self.mcp_manager.configure(self.mcp_servers)
+            for name, tool in list(self.mcp_tools.items()):
+                if tool.config["server"] not in self.mcp_servers:
+                    del self.mcp_tools[name]
+            self._mcp_fingerprints = {server: fp for server, fp in self._mcp_fingerprints.items() if server in self.mcp_servers}
+
+            self._publish_registry()
             await self.index_tools()
-                
-        except Exception as e:
-            logger.critical(f"Critical error loading tool registry: {e}", exc_info=True)
-            raise SystemExit(f"Halt: Registry failure {e}")
+            self._config_signature = signature
+
+    def _publish_registry(self):
+        tools = {**self.mcp_tools, **self.tools}
+        previous = self.snapshot
+        if tools == dict(previous.tools):
+            return
+        validators = {}
+        for name, tool in tools.items():
+            old = previous.tools.get(name)
+            if old is not None and old.input_schema == tool.input_schema and name in previous.validators:
+                validators[name] = previous.validators[name]
+                continue
+            try:
+                validators[name] = compile_validator(tool.input_schema)
+            except Exception as e:
+                logger.warning(f"Invalid input_schema for tool {name}, arguments will not be validated: {e}")
+        self.snapshot = ToolRegistrySnapshot(version=previous.version + 1, tools=MappingProxyType(tools), validators=MappingProxyType(validators))
+
+    def _all_tools(self) -> Mapping[str, ToolDefinition]:
+        return self.snapshot.tools
+
+    @staticmethod
+    def _index_text(tool: ToolDefinition) -> str:
+        return f"{tool.name}: {tool.description}"
 
     async def index_tools(self):
-        self.vector_store.remove_all()
-        self.tool_names_in_index = []
-        # Index local
-        for name, tool in self.tools.items():
-            self.vector_store.add_skill(name, f"{name}: {tool.description}")
-            self.tool_names_in_index.append(name)
+        """Bring the tool index in line with the snapshot: only new, changed or previously failed tools are embedded."""
+        tools = self._all_tools()
+        current = self.vector_store.current
+        removed = [name for name in current.texts if name not in tools]
+        changed = [
+            tool for name, tool in tools.items()
+            if current.texts.get(name) != self._index_text(tool) or name in current.degraded_ids
+        ]
+        if removed:
+            await self.vector_store.aremove_many(removed)
+        if changed:
+            await self.vector_store.aupsert_many([tool.name for tool in changed], [self._index_text(tool) for tool in changed])
+        self.tool_names_in_index = list(tools)
+        if changed or removed:
+            logger.info(f"Tool index: {len(changed)} (re)indexed, {len(removed)} removed, {len(tools)} total (embedding cache: {self.vector_store.cache_stats()})")
+
+    def _mcp_tool_definition(self, server_name: str, tool: Any) -> ToolDefinition:
+        # Field names differ between MCP SDK releases (inputSchema vs input_schema)
+        input_schema = getattr(tool, "inputSchema", None) or getattr(tool, "input_schema", None) or {}
+        output_schema = getattr(tool, "outputSchema", None) or getattr(tool, "output_schema", None)
+        annotations = getattr(tool, "annotations", None)
+        read_only = getattr(annotations, "readOnlyHint", None) or getattr(annotations, "read_only_hint", None)
+        # mcp.json: "cache": {"<tool>": {"ttl_seconds": 600, "max_entries": 100}} opts tools into result caching
+        cache = self.mcp_servers.get(server_name, {}).get("cache", {}).get(tool.name)
+        return ToolDefinition(
+            name=f"{server_name}.{tool.name}",
+            description=tool.description or tool.name,
+            type=ToolType.MCP,
+            input_schema=input_schema,
+            output_schema=output_schema,
+            # Sessions multiplex requests, so side-effect-free tools can run side by side
+            parallel_capable=bool(read_only),
+            config={"server": server_name, "tool": tool.name},
+            **({"cacheable": True, **cache} if cache is not None else {})
+        )
+
+    async def _discover_mcp_tools(self, server_name: str):
+        """List a server's tools after it (re)connects and re-index only what changed."""
+        definitions = {
+            tool_def.name: tool_def
+            for tool_def in (self._mcp_tool_definition(server_name, tool) for tool in await self.mcp_manager.list_tools(server_name))
+        }
+        payload = json.dumps([tool_def.model_dump(mode="json") for tool_def in definitions.values()], sort_keys=True)
+        fingerprint = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        if self._mcp_fingerprints.get(server_name) == fingerprint:
+            return
+
+        previous = {name for name, tool_def in self.mcp_tools.items() if tool_def.config["server"] == server_name}
+        for name in previous - definitions.keys():
+            del self.mcp_tools[name]
+        self.mcp_tools.update(definitions)
+        self._mcp_fingerprints[server_name] = fingerprint
+        self._publish_registry()
+        await self.index_tools()
+        logger.info(f"MCP server {server_name}: {len(definitions)} tools, {len(previous - definitions.keys())} removed")
 
     async def search_tools(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
         """Search for tools based on a natural language query."""
-        return self.vector_store.search(query, top_k=top_k)
+        return await self.vector_store.asearch(query, top_k=top_k)
 
     async def get_tool(self, name: str) -> Optional[ToolDefinition]:
-        return self.tools.get(name)
+        return self._all_tools().get(name)
 
     async def list_tools(self) -> List[ToolDefinition]:
-        return list(self.tools.values())
+        return list(self._all_tools().values())
+
+    async def select_tools(self, query: str, top_k: Optional[int] = None, exclude: Iterable[str] = ()) -> List[ToolDefinition]:
+        """The ``top_k`` tools most relevant to ``query`` plus the pinned tools.
 
-    def get_langchain_tools(self) -> List[BaseTool]:
+        Tools named in ``exclude`` (e.g. builtins the caller already offers) are never returned.
+        Falls back to every tool when selection is disabled (k <= 0), the catalogue is no
+        bigger than the selection, or the tool index cannot answer.
+        """
+        excluded = set(exclude)
+        tools = {name: tool for name, tool in self._all_tools().items() if name not in excluded}
+        top_k = self.tool_top_k if top_k is None else top_k
+        pinned = [name for name in self.pinned_tools if name in tools]
+        if top_k <= 0 or len(tools) <= top_k + len(pinned):
+            return list(tools.values())
+        try:
+            matches = await self.search_tools(query, top_k=top_k + len(pinned) + len(excluded))
+        except Exception as e:
+            logger.warning(f"Tool selection failed, offering all tools: {e}")
+            return list(tools.values())
+        relevant = [name for name, _ in matches if name in tools and name not in pinned][:top_k]
+        if not relevant:
+            return list(tools.values())
+        return [tools[name] for name in pinned + relevant]
+
+    async def agent_tools(self, query: str, builtin: List[BaseTool]) -> List[BaseTool]:
+        """The tool list for an agent session: ``builtin`` first, then the registry tools relevant to ``query``."""
+        # Loaded at startup and kept current by the registry watcher; no disk or embedding calls here
+        await self.ensure_registry()
+        # A registry tool named like a builtin would only duplicate it in the prompt
+        selected = await self.select_tools(query, exclude=[tool.name for tool in builtin])
+        return list(builtin) + self.get_langchain_tools(selected)
+
+    def get_langchain_tools(self, tool_defs: Optional[List[ToolDefinition]] = None) -> List[BaseTool]:
+        """LangChain wrappers for ``tool_defs`` (default: every registered tool)."""
         lc_tools = []
-        for tool_def in self.tools.values():
+        for tool_def in (self._all_tools().values() if tool_defs is None else tool_defs):
             if tool_def.type == ToolType.LOCAL:
-                lc_tools.append(DynamicLocalTool(name=tool_def.name, description=tool_def.description, tool_def=tool_def))
+                lc_tools.append(DynamicLocalTool(name=tool_def.name, description=tool_def.description, tool_def=tool_def, validator=self.snapshot.validators.get(tool_def.name)))
+            elif tool_def.type == ToolType.MCP:
+                lc_tools.append(MCPToolWrapper(
+                    name=tool_def.name,
+                    description=tool_def.description,
+                    server_name=tool_def.config["server"],
+                    tool_name=tool_def.config["tool"],
+                    tool_def=tool_def,
+                    validator=self.snapshot.validators.get(tool_def.name)
+                ))
         return lc_tools
 
     async def get_mcp_session(self, server_name: str) -> ClientSession:
-        """Establish or return an existing MCP session with retry logic per FR-017."""
-        if server_name in self.mcp_sessions:
-            return self.mcp_sessions[server_name]
-        
-        if server_name not in self.mcp_servers:
-            raise ValueError(f"MCP server {server_name} not configured")
-        
-        cfg = self.mcp_servers[server_name]
-        params = StdioServerParameters(
-            command=cfg["command"],
-            args=cfg["args"],
-            env={**os.environ, **cfg.get("env", {})}
-        )
-        
-        last_err = None
-        for attempt in range(3):
-            try:
-                transport_ctx = stdio_client(params)
-                read, write = await transport_ctx.__aenter__()
-                session = ClientSession(read, write)
-                await session.initialize()
-                self.mcp_sessions[server_name] = session
-                return session
-            except Exception as e:
-                last_err = e
-                wait = (2 ** attempt)
-                logger.warning(f"MCP connection attempt {attempt+1} failed for {server_name}: {e}. Retrying in {wait}s...")
-                await asyncio.sleep(wait)
-        
-        raise Exception(f"Failed to connect to MCP server {server_name} after 3 attempts: {last_err}")
+        """A live pooled session for the server; the manager owns its lifecycle."""
+        return (await self.mcp_manager.acquire(server_name)).session
 
     async def call_mcp_tool(self, server_name: str, tool_name: str, args: Dict[str, Any]) -> Any:
+        tool = self.mcp_tools.get(f"{server_name}.{tool_name}")
+        is_success = lambda result: not (getattr(result, "isError", False) or getattr(result, "is_error", False))
+
+        async def call():
+            if tool is None:
+                return await self.mcp_manager.call_tool(server_name, tool_name, args)
+            # A hung server costs one timeout per call, and repeated failures open the breaker
+            return await self.guards.get(tool).run(
+                lambda: self.mcp_manager.call_tool(server_name, tool_name, args, timeout=tool.timeout),
+                is_success=is_success
+            )
+
         try:
-            session = await self.get_mcp_session(server_name)
-            result = await session.call_tool(tool_name, args)
+            if tool and tool.cacheable:
+                result = await self.result_cache.get_or_call(
+                    tool.name, args, call,
+                    ttl_seconds=tool.ttl_seconds,
+                    max_entries=tool.max_entries,
+                    is_success=is_success
+                )
+            else:
+                result = await call()
             return result.content
+        except ToolRejected as e:
+            return f"Error: {str(e)}"
         except Exception as e:
             logger.error(f"MCP call error ({server_name}/{tool_name}): {e}")
             return f"Error: {str(e)}"
 
+    async def shutdown(self):
+        """Stop MCP server processes and the local tool thread pool, and flush the execution log."""
+        await self.mcp_manager.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        await self.log_writer.close()
+
+    def _load_module(self, tool_name: str, script_path: Path) -> ModuleType:
+        """Return the cached module for a tool script, re-executing it only when the file changed."""
+        key = str(script_path)
+        now = time.monotonic()
+        cached = self._module_cache.get(key)
+        if cached and now - cached[2] < self.module_check_interval:
+            return cached[1]
+
+        stat = script_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if cached and cached[0] == signature:
+            module = cached[1]
+        else:
+            spec = importlib.util.spec_from_file_location(tool_name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            if cached:
+                logger.info(f"Reloaded local tool module {tool_name} from {script_path}")
+        self._module_cache[key] = (signature, module, now)
+        return module
+
     async def execute_local_tool(self, tool: ToolDefinition, args: Dict[str, Any]) -> ToolResponse:
+        if tool.cacheable:
+            return await self.result_cache.get_or_call(
+                tool.name, args,
+                lambda: self._guarded_local_tool(tool, args),
+                ttl_seconds=tool.ttl_seconds,
+                max_entries=tool.max_entries,
+                is_success=_is_successful_response
+            )
+        return await self._guarded_local_tool(tool, args)
+
+    async def _guarded_local_tool(self, tool: ToolDefinition, args: Dict[str, Any]) -> ToolResponse:
+        try:
+            return await self.guards.get(tool).run(lambda: self._execute_local_tool(tool, args), is_success=_is_tool_healthy)
+        except ToolRejected as e:
+            # Fails fast: the agent gets an error observation without waiting on the tool
+            return ToolResponse(status=ExecutionStatus.ERROR, message=str(e))
+
+    def breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.guards.stats()
+
+    async def _execute_local_tool(self, tool: ToolDefinition, args: Dict[str, Any]) -> ToolResponse:
         # Resolve script path based on registry file location
         script_path = self.tools_config_path.parent / tool.config.get("script_path", "")
         entrypoint = tool.config.get("entrypoint", "run")
-        if not script_path.exists():
+        if str(script_path) not in self._module_cache and not script_path.exists():
             return ToolResponse(status=ExecutionStatus.ERROR, message=f"Script not found: {script_path}")
 
         start_time = datetime.now()
         try:
-            spec = importlib.util.spec_from_file_location(tool.name, script_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            func = getattr(module, entrypoint)
-            result_data = await asyncio.wait_for(func(args), timeout=tool.timeout)
+            func = getattr(self._load_module(tool.name, script_path), entrypoint)
+            call_args = (args, ToolContext(tool.name, tool.config, http_pool)) if _accepts_context(func) else (args,)
+            if inspect.iscoroutinefunction(func):
+                call = func(*call_args)
+            else:
+                call = asyncio.get_running_loop().run_in_executor(self._executor, func, *call_args)
+            result_data = await asyncio.wait_for(call, timeout=tool.timeout)
             status = ExecutionStatus.SUCCESS
             error_msg = None
         except Exception as e:
@@ -247,7 +539,14 @@ class ToolService:
         await self._log_execution(log)
         return ToolResponse(status=status, data=result_data, message=error_msg, execution_id=log.id)
 
+    def cache_stats(self) -> Dict[str, Dict[str, float]]:
+        return self.result_cache.stats()
+
     async def _log_execution(self, log: ToolExecutionLog):
-        self.log_file_path.parent.mkdir(parents=True, exist_ok=True)
-        async with aiofiles.open(self.log_file_path, mode='a') as f:
-            await f.write(log.model_dump_json() + "\n")
+        # Large arguments and results are clipped so one call cannot bloat the log
+        limit = self.log_max_field_chars
+        log = log.model_copy(update={
+            "input_args": {key: truncate_payload(value, limit) for key, value in log.input_args.items()},
+            "output": truncate_payload(log.output, limit)
+        })
+        self.log_writer.write(log.model_dump_json())
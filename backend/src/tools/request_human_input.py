@@ -11,7 +11,7 @@ async def run(args: dict) -> dict:
     """
     question = args.get("question")
     if not question:
-        return {"error": "Missing 'question' parameter"}
+        return {"error": "Missing 'question' parameter", "caller_error": True}
 
     # In our HITL architecture, this tool usually triggers an interruption.
     # However, for the 'request_human_input' script, we will return a special
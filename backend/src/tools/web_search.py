@@ -4,14 +4,15 @@ import os
 
 logger = logging.getLogger(__name__)
 
-async def run(args: dict) -> dict:
+async def run(args: dict, context=None) -> dict:
     """
     Perform a web search using Tavily API (example).
-    Expects 'query' in args.
+    Expects 'query' in args. ``context.http`` is the shared keep-alive client
+    configured by this tool's "http" block in tools.json.
     """
     query = args.get("query")
     if not query:
-        return {"error": "Missing 'query' parameter"}
+        return {"error": "Missing 'query' parameter", "caller_error": True}
 
     api_key = os.getenv("TAVILY_API_KEY")
     if not api_key:
@@ -24,17 +25,19 @@ async def run(args: dict) -> dict:
         }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.tavily.com/search",
-                json={
-                    "api_key": api_key,
-                    "query": query,
-                    "search_depth": "basic"
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        payload = {
+            "api_key": api_key,
+            "query": query,
+            "search_depth": "basic"
+        }
+        if context is not None:
+            response = await context.http.post("https://api.tavily.com/search", json=payload)
+        else:
+            # Called outside ToolService: no pooled client available
+            async with httpx.AsyncClient() as client:
+                response = await client.post("https://api.tavily.com/search", json=payload)
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"Web search error: {e}")
         return {"error": str(e)}
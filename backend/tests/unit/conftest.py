@@ -0,0 +1,32 @@
+import json
+import pytest
+from src.core.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from src.core.embeddings import LocalEmbeddingProvider
+from src.core.vector_store import VectorStore
+from src.services.tool_service import ToolService
+
+@pytest.fixture
+def tool_service_factory(tmp_path):
+    """Build the ToolService singleton on tmp_path configs with an offline embedding provider.
+
+    ToolService starts background tasks, so it has to be created inside the running test loop.
+    """
+    def _create_service(tools=None, mcp_servers=None, mcp_factory=None):
+        if tools is not None:
+            (tmp_path / "tools.json").write_text(json.dumps({"tools": tools}))
+        (tmp_path / "mcp.json").write_text(json.dumps({"mcp_servers": mcp_servers or {}}))
+        service = ToolService(tools_config_path=str(tmp_path / "tools.json"), mcp_config_path=str(tmp_path / "mcp.json"))
+        service.tools_config_path = tmp_path / "tools.json"
+        service.mcp_config_path = tmp_path / "mcp.json"
+        service.log_file_path = tmp_path / "logs/tools.log"
+        service.reset_for_test()
+        service.module_check_interval = 0
+        if mcp_factory is not None:
+            service.mcp_manager.factory = mcp_factory
+        service.vector_store = VectorStore(
+            cache=EmbeddingCache(cache_dir=str(tmp_path / "embeddings")),
+            query_cache=QueryEmbeddingCache(),
+            provider=LocalEmbeddingProvider(dimension=256)
+        )
+        return service
+    return _create_service
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from pathlib import Path
+import pytest
+from types import SimpleNamespace
+from src.core.agent_loop import InterruptibleAgentLoop, parse_actions, parse_action_input
+from src.models.tool import ToolDefinition, ToolType
+from src.models.execution import ExecutionSession, ExecutionMode, ExecutionStatus
+from src.services.session_registry import session_registry
+from src.core.tools import HumanInterrupt, RequestInputTool
+
+class FakeTool:
+    def __init__(self, name, parallel, delay=0.05, tool_def=None):
+        self.name = name
+        self.description = name
+        self.tool_def = tool_def or SimpleNamespace(parallel_capable=parallel)
+        self.inputs = []
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def ainvoke(self, tool_input):
+        self.inputs.append(tool_input)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return f"{self.name}({tool_input})"
+
+class ScriptedLLM:
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(content=self.turns.pop(0))
+
+@pytest.fixture
+def session_id(monkeypatch, tmp_path):
+    monkeypatch.setattr(session_registry, "storage_dir", tmp_path)
+    session = ExecutionSession(skill_id="s", mode=ExecutionMode.AUTONOMOUS, status=ExecutionStatus.RUNNING)
+    monkeypatch.setitem(session_registry._sessions, session.session_id, session)
+    return session.session_id
+
+def test_parse_actions_reads_every_pair_in_order():
+    content = 'Thought: plan\nAction: search\nAction Input: {"query": "a"}\nAction: calc\nAction Input: 1 + 1'
+    assert parse_actions(content) == [("search", '{"query": "a"}'), ("calc", "1 + 1")]
+
+@pytest.mark.asyncio
+async def test_parallel_actions_run_concurrently_with_ordered_observations(session_id):
+    search = FakeTool("search", parallel=True, delay=0.1)
+    ask = FakeTool("ask", parallel=False, delay=0)
+    llm = ScriptedLLM([
+        "Thought: look up three things\n"
+        "Action: search\nAction Input: a\n"
+        "Action: search\nAction Input: b\n"
+        "Action: search\nAction Input: c\n"
+        "Action: ask\nAction Input: d",
+        "Final Answer: done",
+    ])
+    loop = InterruptibleAgentLoop(session_id, max_parallel_tools=2)
+
+    result = await loop.run(llm, [search, ask], "{tools} {tool_names} {input} {agent_scratchpad}", "q")
+
+    assert result == {"output": "done"}
+    assert search.max_running == 2
+    scratchpad = llm.prompts[1]
+    positions = [scratchpad.index(f"Observation: {obs}") for obs in ["search(a)", "search(b)", "search(c)", "ask(d)"]]
+    assert positions == sorted(positions)
+
+def test_parse_action_input():
+    schema = {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+    assert parse_action_input('{"query": "a"}', schema) == {"query": "a"}
+    assert parse_action_input('```json\n{"query": "a"}\n```', schema) == {"query": "a"}
+    # Bare text is accepted for single-parameter tools
+    assert parse_action_input("weather in Paris", schema) == {"query": "weather in Paris"}
+    with pytest.raises(ValueError):
+        parse_action_input("a, b", {"properties": {"a": {}, "b": {}}})
+
+@pytest.mark.asyncio
+async def test_invalid_or_oversized_input_is_rejected_without_calling_the_tool(tool_service_factory, session_id):
+    service = tool_service_factory()
+    schema = {"type": "object", "properties": {"query": {"type": "string"}, "limit": {"type": "integer", "maximum": 10}}, "required": ["query"]}
+    tool_def = ToolDefinition(name="search", description="search", type=ToolType.LOCAL, input_schema=schema)
+    service.tools = {"search": tool_def}
+    service._publish_registry()
+    # The registry compiles the schema once and hands the validator to the wrapper
+    wrapper = service.get_langchain_tools()[0]
+    assert wrapper.validator is service.snapshot.validators["search"]
+    search = FakeTool("search", parallel=False, delay=0, tool_def=tool_def)
+    search.validator = wrapper.validator
+    loop = InterruptibleAgentLoop(session_id)
+    loop.max_input_chars = 100
+
+    bad = await loop._invoke(search, "search", '{"limit": 50}')
+    too_big = await loop._invoke(search, "search", '{"query": "' + "x" * 200 + '"}')
+    good = await loop._invoke(search, "search", '{"query": "q", "limit": 5}')
+
+    assert bad == "Error: Invalid Action Input for search: <input>: 'query' is a required property; limit: 50 is greater than the maximum of 10"
+    assert too_big.startswith("Error: Action Input for search is 2")
+    assert search.inputs == [{"query": "q", "limit": 5}]
+    assert good == "search({'query': 'q', 'limit': 5})"
+
+@pytest.mark.asyncio
+async def test_duplicate_tool_names_resolve_to_the_first_tool(session_id):
+    first = FakeTool("lookup", parallel=False, delay=0)
+    second = FakeTool("lookup", parallel=False, delay=0)
+    loop = InterruptibleAgentLoop(session_id)
+
+    assert await loop._execute_actions([("lookup", "x")], [first, second]) == ["lookup(x)"]
+    assert second.inputs == []
+
+@pytest.mark.asyncio
+async def test_request_human_input_interrupts_with_the_execution_tool_list(tool_service_factory, session_id):
+    tools_json = Path(__file__).parents[2] / "src/tools/tools.json"
+    service = tool_service_factory(json.loads(tools_json.read_text())["tools"])
+    # Built exactly as the execution service does; tools.json also defines a request_human_input
+    tools = await service.agent_tools("Which colour should the report use?", [RequestInputTool()])
+    assert [tool.name for tool in tools].count("request_human_input") == 1
+    llm = ScriptedLLM(['Thought: ask\nAction: request_human_input\nAction Input: Which colour do you prefer?'])
+
+    with pytest.raises(HumanInterrupt, match="Which colour do you prefer?"):
+        await InterruptibleAgentLoop(session_id).run(llm, tools, "{tools} {tool_names} {input} {agent_scratchpad}", "q", mode="HITL")
@@ -0,0 +1,133 @@
+import numpy as np
+from src.core.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from src.core import embeddings as embeddings_module
+from src.core.embeddings import LocalEmbeddingProvider, get_embedding_provider
+from src.core.vector_store import VectorStore
+
+def test_cache_roundtrip_and_stats(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+    key = cache.make_key("model", "retrieval_document", "hello")
+
+    assert cache.get(key) is None
+    cache.put(key, np.ones(4, dtype=np.float32))
+
+    # A fresh instance reads the persisted entry from disk
+    reloaded = EmbeddingCache(cache_dir=str(tmp_path))
+    assert np.array_equal(reloaded.get(key), np.ones(4, dtype=np.float32))
+
+    assert cache.stats()["misses"] == 1
+    assert reloaded.stats()["hits"] == 1
+
+def test_memory_tier_is_a_bounded_lru_over_disk(tmp_path):
+    cache = EmbeddingCache(cache_dir=str(tmp_path), memory_entries=2)
+    keys = [cache.make_key("model", "retrieval_document", text) for text in ("a", "b", "c")]
+    for i, key in enumerate(keys):
+        cache.put(key, np.full(4, i, dtype=np.float32))
+
+    stats = cache.stats()
+    assert stats["entries_in_memory"] == 2 and stats["evictions"] == 1
+    # The evicted entry is still served from disk and becomes most recently used again
+    assert np.array_equal(cache.get(keys[0]), np.zeros(4, dtype=np.float32))
+    assert list(cache._memory) == keys[2:] + keys[:1]
+
+    disk_only = EmbeddingCache(cache_dir=str(tmp_path), memory_entries=0)
+    assert disk_only.get(keys[1]) is not None
+    assert disk_only.stats()["entries_in_memory"] == 0
+
+def test_key_depends_on_model_task_and_text():
+    keys = {
+        EmbeddingCache.make_key("m1", "retrieval_document", "a"),
+        EmbeddingCache.make_key("m2", "retrieval_document", "a"),
+        EmbeddingCache.make_key("m1", "retrieval_query", "a"),
+        EmbeddingCache.make_key("m1", "retrieval_document", "b"),
+    }
+    assert len(keys) == 4
+
+def test_vector_store_only_embeds_changed_text(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_embed_content(model, content, task_type, **kwargs):
+        calls.extend(content)
+        return {"embedding": [[float(len(text))] * 4 for text in content]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", fake_embed_content)
+    cache = EmbeddingCache(cache_dir=str(tmp_path))
+
+    store = VectorStore(dimension=4, cache=cache)
+    store.add_skill("a", "alpha")
+    store.add_skill("b", "beta")
+
+    # Simulate a restart re-indexing the same skills plus one edited description
+    restarted = VectorStore(dimension=4, cache=EmbeddingCache(cache_dir=str(tmp_path)))
+    restarted.add_skill("a", "alpha")
+    restarted.add_skill("b", "beta v2")
+
+    assert calls == ["alpha", "beta", "beta v2"]
+
+def test_query_cache_lru_eviction_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.core.embedding_cache.time.monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(max_size=2, ttl_seconds=10)
+
+    cache.put("a", np.zeros(1))
+    cache.put("b", np.zeros(1))
+    assert cache.get("a") is not None  # "a" becomes most recently used
+    cache.put("c", np.zeros(1))        # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+    now[0] += 11
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+def test_repeated_search_embeds_query_once(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_embed_content(model, content, task_type, **kwargs):
+        calls.append((content, task_type))
+        if isinstance(content, list):
+            return {"embedding": [[1.0] * 4 for _ in content]}
+        return {"embedding": [1.0] * 4}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", fake_embed_content)
+    store = VectorStore(dimension=4, cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache(max_size=8))
+    store.upsert("a", "alpha")
+    calls.clear()
+
+    store.search("find alpha")
+    store.search("find alpha")
+
+    assert calls == [(["find alpha"], "retrieval_query")]
+    assert store.query_cache_stats()["hit_rate"] == 0.5
+
+def test_local_provider_is_deterministic_and_offline(tmp_path):
+    provider = LocalEmbeddingProvider(dimension=256)
+    first = provider.embed(["compound interest calculator"], "retrieval_document")
+    second = LocalEmbeddingProvider(dimension=256).embed(["compound interest calculator"], "retrieval_query")
+
+    assert first.shape == (1, 256)
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+
+    store = VectorStore(cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache(), provider=provider)
+    store.upsert_many(["calc", "weather"], ["Compound interest calculator", "Weather forecast lookup"])
+    assert store.dimension == 256
+    assert store.search("calculate compound interest", top_k=1)[0][0] == "calc"
+    assert store.search("what is the weather forecast", top_k=1)[0][0] == "weather"
+
+def test_provider_selected_by_env(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    assert isinstance(get_embedding_provider(), LocalEmbeddingProvider)
+
+def test_configured_dimension_is_clamped_to_the_provider(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_DIMENSION", "3072")
+    store = VectorStore(cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache(), provider=LocalEmbeddingProvider(dimension=256))
+
+    assert store.dimension == 256
+    store.upsert_many(["calc", "weather"], ["Compound interest calculator", "Weather forecast lookup"])
+    assert store.search("compound interest", top_k=1)[0][0] == "calc"
@@ -0,0 +1,31 @@
+import pytest
+from src.core.http_pool import HTTPClientPool
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_per_config_and_closed():
+    pool = HTTPClientPool()
+    config = {"timeout": {"connect": 1, "read": 7}, "max_connections": 4}
+    client = pool.client(config)
+
+    assert pool.client(dict(config)) is client
+    assert pool.client({"timeout": 3}) is not client
+    assert (client.timeout.connect, client.timeout.read) == (1, 7)
+
+    await pool.close()
+    assert client.is_closed
+    # A closed pool hands out fresh clients rather than dead ones
+    assert not pool.client(config).is_closed
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_limits_come_from_env_and_http2_is_opt_in(monkeypatch):
+    import src.core.http_pool as http_pool_module
+
+    monkeypatch.setenv("HTTP_MAX_CONNECTIONS", "7")
+    pool = HTTPClientPool()
+    assert pool.max_connections == 7
+
+    # Requesting HTTP/2 without h2 installed falls back to HTTP/1.1 instead of failing
+    monkeypatch.setattr(http_pool_module, "HTTP2_AVAILABLE", False)
+    assert pool.client({"http2": True}) is not None
+    await pool.close()
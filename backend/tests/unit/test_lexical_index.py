@@ -0,0 +1,42 @@
+import time
+from src.core.lexical_index import LexicalIndex, fuse_rankings, tokenize
+
+def test_tokenize_lowercases_and_splits():
+    assert tokenize("Compound-Interest Calculator v2") == ["compound", "interest", "calculator", "v2"]
+
+def test_bm25_ranks_matching_document_first():
+    index = LexicalIndex()
+    index.upsert("a", "Compound interest calculator for savings")
+    index.upsert("b", "Weather forecast lookup")
+    index.upsert("c", "Simple interest on loans")
+
+    results = index.search("compound interest")
+    assert results[0][0] == "a"
+    assert all(0.0 < score < 1.0 for _, score in results)
+    assert "b" not in dict(results)
+
+def test_incremental_upsert_and_remove():
+    index = LexicalIndex()
+    index.upsert("a", "alpha beta")
+    index.upsert("a", "gamma")
+    assert index.search("alpha") == []
+    assert index.search("gamma")[0][0] == "a"
+
+    assert index.remove("a") is True
+    assert index.remove("a") is False
+    assert len(index) == 0
+    assert index.search("gamma") == []
+
+def test_search_is_fast_at_scale():
+    index = LexicalIndex()
+    for i in range(5000):
+        index.upsert(str(i), f"skill number {i} handles task{i % 97} with tool{i % 13}")
+
+    start = time.perf_counter()
+    index.search("handles task42 with tool7", top_k=10)
+    assert time.perf_counter() - start < 0.05
+
+def test_fuse_rankings_rewards_agreement():
+    vector = [("a", 0.1), ("b", 0.2)]
+    lexical = [("b", 0.9), ("c", 0.5)]
+    assert fuse_rankings(vector, lexical)[0] == "b"
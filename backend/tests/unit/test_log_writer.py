@@ -0,0 +1,51 @@
+import gzip
+import json
+import os
+import time
+import pytest
+from src.core.log_writer import AsyncLogWriter, truncate_payload
+
+@pytest.mark.asyncio
+async def test_lines_are_batched_and_flushed_on_close(tmp_path):
+    writer = AsyncLogWriter(tmp_path / "tools.log", flush_interval=60)
+    for i in range(5):
+        writer.write(json.dumps({"i": i}))
+    # Nothing touches the file until the flush interval or close
+    assert not (tmp_path / "tools.log").exists()
+
+    await writer.close()
+    lines = (tmp_path / "tools.log").read_text().splitlines()
+    assert [json.loads(line)["i"] for line in lines] == list(range(5))
+    assert writer.stats()["written"] == 5
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking(tmp_path):
+    writer = AsyncLogWriter(tmp_path / "tools.log", max_queue=2, flush_interval=60)
+    for i in range(5):
+        writer.write(str(i))
+    await writer.close()
+    assert writer.stats()["dropped"] == 3
+    assert (tmp_path / "tools.log").read_text().splitlines() == ["0", "1"]
+
+@pytest.mark.asyncio
+async def test_size_rotation_compresses_and_prunes(tmp_path):
+    old = tmp_path / "tools.log.20000101-000000-000000.gz"
+    old.write_bytes(b"")
+    os.utime(old, (time.time() - 40 * 86400,) * 2)
+
+    writer = AsyncLogWriter(tmp_path / "tools.log", max_bytes=10, flush_interval=60, retention_days=30)
+    writer.write("first line, long enough")
+    await writer.close()
+    writer.write("second")
+    await writer.close()
+
+    rotated = list(tmp_path.glob("tools.log.*.gz"))
+    assert len(rotated) == 1 and not old.exists()
+    assert gzip.decompress(rotated[0].read_bytes()).decode() == "first line, long enough\n"
+    assert (tmp_path / "tools.log").read_text() == "second\n"
+
+def test_truncate_payload():
+    assert truncate_payload({"a": 1}, 100) == {"a": 1}
+    clipped = truncate_payload("x" * 50, 10)
+    assert clipped == "x" * 10 + "... [truncated 40 chars]"
+    assert truncate_payload(["y" * 20], 5).startswith('["yyy')
@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+from src.services.mcp_manager import MCPSessionManager
+
+class FakeSession:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.running = 0
+        self.max_running = 0
+
+    async def send_ping(self):
+        if not self.healthy:
+            raise ConnectionError("no pong")
+
+    async def call_tool(self, name, args):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return SimpleNamespace(content=f"{name}:{self.number}")
+
+class FakeServers:
+    def __init__(self):
+        self.sessions = []
+        self.closed = 0
+
+    @asynccontextmanager
+    async def connect(self, server_name, cfg):
+        session = FakeSession(len(self.sessions))
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            self.closed += 1
+
+@pytest.mark.asyncio
+async def test_pool_starts_eagerly_multiplexes_and_closes():
+    servers = FakeServers()
+    manager = MCPSessionManager(factory=servers.connect, pool_size=2, ping_interval=60)
+    await manager.configure({"demo": {"command": "demo"}})
+    assert len(servers.sessions) == 2
+
+    results = await asyncio.gather(*(manager.call_tool("demo", "echo", {}) for _ in range(6)))
+
+    # Calls are spread over both processes and overlap on each session
+    assert {result.content for result in results} == {"echo:0", "echo:1"}
+    assert all(session.max_running > 1 for session in servers.sessions)
+    await manager.close()
+    assert servers.closed == 2
+
+@pytest.mark.asyncio
+async def test_failed_ping_reconnects_and_unchanged_config_is_kept():
+    servers = FakeServers()
+    manager = MCPSessionManager(factory=servers.connect, pool_size=1, ping_interval=0.05)
+    await manager.configure({"demo": {"command": "demo"}})
+    await manager.configure({"demo": {"command": "demo"}})
+    assert len(servers.sessions) == 1
+
+    servers.sessions[0].healthy = False
+    for _ in range(50):
+        await asyncio.sleep(0.02)
+        if len(servers.sessions) == 2 and manager.stats()["demo"]["alive"] == 1:
+            break
+
+    assert (await manager.call_tool("demo", "echo", {})).content == "echo:1"
+    assert manager.stats()["demo"]["restarts"] == 1
+    await manager.close()
+    assert servers.closed == 2
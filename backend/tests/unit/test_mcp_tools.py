@@ -0,0 +1,68 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+from src.services.tool_service import MCPToolWrapper
+
+class FakeMCPServer:
+    def __init__(self):
+        self.tools = [
+            SimpleNamespace(name="add", description="Add two numbers", inputSchema={"type": "object"}, annotations=SimpleNamespace(readOnlyHint=True)),
+            SimpleNamespace(name="send_email", description="Send an email", inputSchema={"type": "object"}, annotations=None),
+        ]
+        self.calls = []
+
+    async def send_ping(self):
+        pass
+
+    async def list_tools(self):
+        return SimpleNamespace(tools=list(self.tools))
+
+    async def call_tool(self, name, args):
+        self.calls.append((name, args))
+        return SimpleNamespace(content=f"{name} ok")
+
+    @asynccontextmanager
+    async def connect(self, server_name, cfg):
+        yield self
+
+@pytest.mark.asyncio
+async def test_mcp_tools_are_discovered_indexed_and_callable(tool_service_factory):
+    server = FakeMCPServer()
+    service = tool_service_factory([], {"demo": {"command": "demo"}}, server.connect)
+
+    await service.load_registry()
+
+    wrappers = {tool.name: tool for tool in service.get_langchain_tools() if isinstance(tool, MCPToolWrapper)}
+    assert set(wrappers) == {"demo.add", "demo.send_email"}
+    assert wrappers["demo.add"].tool_def.parallel_capable is True
+    assert wrappers["demo.send_email"].tool_def.parallel_capable is False
+    assert (await service.search_tools("add two numbers", top_k=1))[0][0] == "demo.add"
+
+    assert await wrappers["demo.add"]._arun(a=1, b=2) == "add ok"
+    assert server.calls == [("add", {"a": 1, "b": 2})]
+    await service.mcp_manager.close()
+
+@pytest.mark.asyncio
+async def test_rediscovery_only_reindexes_changes(tool_service_factory, monkeypatch):
+    server = FakeMCPServer()
+    service = tool_service_factory([], {"demo": {"command": "demo"}}, server.connect)
+    await service.load_registry()
+
+    upserts = []
+    original = service.vector_store.aupsert_many
+    async def spy(ids, texts, attributes=None):
+        upserts.append(list(ids))
+        await original(ids, texts, attributes)
+    monkeypatch.setattr(service.vector_store, "aupsert_many", spy)
+
+    await service._discover_mcp_tools("demo")
+    assert upserts == []
+
+    server.tools[0] = SimpleNamespace(name="add", description="Add numbers exactly", inputSchema={"type": "object"}, annotations=None)
+    del server.tools[1]
+    await service._discover_mcp_tools("demo")
+
+    assert upserts == [["demo.add"]]
+    assert "demo.send_email" not in service.vector_store
+    assert [tool.name for tool in await service.list_tools()] == ["demo.add"]
+    await service.mcp_manager.close()
@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from src.core.result_cache import ToolResultCache
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_calls_coalesce_and_are_cached():
+    cache = ToolResultCache()
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"results": ["r"]}
+
+    results = await asyncio.gather(*(
+        cache.get_or_call("web_search", {"query": "q", "depth": 1}, search, ttl_seconds=60, max_entries=10)
+        for _ in range(3)
+    ))
+    # Key order does not matter
+    again = await cache.get_or_call("web_search", {"depth": 1, "query": "q"}, search, ttl_seconds=60, max_entries=10)
+
+    assert len(calls) == 1
+    assert results == [{"results": ["r"]}] * 3 and again == {"results": ["r"]}
+    stats = cache.stats()["web_search"]
+    assert (stats["misses"], stats["coalesced"], stats["hits"], stats["size"]) == (1, 2, 1, 1)
+
+@pytest.mark.asyncio
+async def test_failures_expiry_and_eviction():
+    cache = ToolResultCache()
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        return {"error": "upstream down"} if len(calls) == 1 else {"ok": True}
+
+    is_success = lambda result: "error" not in result
+    assert await cache.get_or_call("t", {"q": 1}, flaky, ttl_seconds=60, max_entries=1, is_success=is_success) == {"error": "upstream down"}
+    assert await cache.get_or_call("t", {"q": 1}, flaky, ttl_seconds=60, max_entries=1, is_success=is_success) == {"ok": True}
+    assert await cache.get_or_call("t", {"q": 1}, flaky, ttl_seconds=60, max_entries=1, is_success=is_success) == {"ok": True}
+    assert len(calls) == 2
+
+    await cache.get_or_call("t", {"q": 2}, flaky, ttl_seconds=60, max_entries=1, is_success=is_success)
+    assert cache.stats()["t"]["evictions"] == 1
+
+    await cache.get_or_call("short", {}, flaky, ttl_seconds=0, max_entries=5)
+    await cache.get_or_call("short", {}, flaky, ttl_seconds=0, max_entries=5)
+    assert cache.stats()["short"]["hits"] == 0
@@ -0,0 +1,48 @@
+import asyncio
+import time
+import pytest
+from src.core.sandbox import SandboxPool
+
+@pytest.mark.asyncio
+async def test_parallel_snippets_have_isolated_output():
+    pool = SandboxPool(size=2, timeout=5)
+    try:
+        results = await asyncio.gather(
+            pool.run("import time\nfor i in range(3):\n    print('a', i)\n    time.sleep(0.05)"),
+            pool.run("import sys, time\nfor i in range(3):\n    print('b', i)\n    time.sleep(0.05)\nprint('warn', file=sys.stderr)"),
+        )
+    finally:
+        await pool.close()
+
+    assert results[0] == {"status": "success", "stdout": "a 0\na 1\na 2\n", "stderr": ""}
+    assert results[1]["stdout"] == "b 0\nb 1\nb 2\n"
+    assert results[1]["stderr"] == "warn\n"
+
+@pytest.mark.asyncio
+async def test_runaway_snippet_is_killed_and_replaced():
+    pool = SandboxPool(size=1, timeout=0.5)
+    try:
+        start = time.monotonic()
+        result = await pool.run("while True:\n    pass")
+        assert result["status"] == "error"
+        assert "timed out" in result["error"]
+        assert time.monotonic() - start < 3
+
+        # The loop keeps serving while the pool respawns the worker
+        assert (await pool.run("print(6 * 7)", timeout=5))["stdout"] == "42\n"
+    finally:
+        await pool.close()
+
+@pytest.mark.asyncio
+async def test_errors_and_exit_do_not_stop_the_worker():
+    pool = SandboxPool(size=1, timeout=5)
+    try:
+        failed = await pool.run("print('before')\nraise ValueError('boom')")
+        exited = await pool.run("raise SystemExit(3)")
+        leaked = await pool.run("import os\nprint(os.environ.get('GOOGLE_API_KEY'))")
+    finally:
+        await pool.close()
+
+    assert failed == {"status": "error", "error": "boom", "caller_error": True, "stdout": "before\n", "stderr": ""}
+    assert exited["status"] == "error"
+    assert leaked["stdout"] == "None\n"
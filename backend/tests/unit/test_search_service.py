@@ -0,0 +1,24 @@
+import pytest
+
+@pytest.fixture
+def search_module(monkeypatch):
+    # Importing the module loads the registry singleton; keep its embeddings offline
+    from src.core.embeddings import LocalEmbeddingProvider
+    from src.core.vector_store import vector_store
+    provider = LocalEmbeddingProvider(dimension=vector_store.dimension)
+    monkeypatch.setattr(vector_store, "provider", provider)
+    monkeypatch.setattr(vector_store, "model", provider.model)
+    from src.services import search
+    return search
+
+def test_pick_best_walks_the_fused_ranking(search_module, monkeypatch):
+    service = search_module.SearchService()
+    service.threshold, service.lexical_threshold = 0.5, 0.3
+    monkeypatch.setattr(search_module.registry_service, "get_skill", lambda skill_id: f"skill {skill_id}")
+    # B sits in both lists, so fusion ranks it above the vector top-1 A, yet it passes neither threshold
+    monkeypatch.setattr(service, "_lexical_search", lambda query, top_k, filters: [("C", 0.25), ("B", 0.2)])
+
+    assert service._pick_best("q", [("A", 0.2), ("B", 0.9)]) == ("skill A", 0.2)
+
+    # Nothing passes: no skill, and the distance of the best-fused candidate
+    assert service._pick_best("q", [("A", 0.8), ("B", 0.9)]) == (None, 0.9)
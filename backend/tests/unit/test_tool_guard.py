@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from src.core.tool_guard import ToolGuard, ToolRejected, CLOSED, OPEN
+
+@pytest.mark.asyncio
+async def test_bulkhead_limits_running_and_queued_calls():
+    guard = ToolGuard("slow")
+    guard.configure(max_concurrency=2, max_queue=1, failure_threshold=0, reset_seconds=30)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "ok"
+
+    calls = [asyncio.create_task(guard.run(slow)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert (guard.running, guard.waiting) == (2, 1)
+    with pytest.raises(ToolRejected):
+        await guard.run(slow)
+
+    release.set()
+    assert await asyncio.gather(*calls) == ["ok"] * 3
+    assert guard.stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_breaker_opens_fails_fast_and_closes_after_trial(monkeypatch):
+    guard = ToolGuard("flaky")
+    guard.configure(max_concurrency=None, max_queue=None, failure_threshold=2, reset_seconds=30)
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        return {"error": "upstream timeout"}
+
+    is_success = lambda result: "error" not in result
+    for _ in range(2):
+        await guard.run(failing, is_success=is_success)
+    assert guard.state == OPEN
+    with pytest.raises(ToolRejected, match="circuit open"):
+        await guard.run(failing, is_success=is_success)
+    assert len(calls) == 2
+
+    # After the reset period one trial call runs; success closes the breaker
+    monkeypatch.setattr(guard, "opened_at", guard.opened_at - 31)
+    async def healthy():
+        return {"results": []}
+    assert await guard.run(healthy, is_success=is_success) == {"results": []}
+    assert guard.state == CLOSED and guard.consecutive_failures == 0
@@ -0,0 +1,95 @@
+import os
+import threading
+import pytest
+from src.models.tool import ToolDefinition, ToolType, ExecutionStatus
+
+def make_tool(name: str, script: str) -> ToolDefinition:
+    return ToolDefinition(name=name, description=name, type=ToolType.LOCAL, input_schema={}, config={"script_path": script, "entrypoint": "run"})
+
+@pytest.mark.asyncio
+async def test_module_is_loaded_once_and_reloaded_on_change(tool_service_factory, tmp_path):
+    service = tool_service_factory()
+    script = tmp_path / "counter.py"
+    script.write_text("LOADED = object()\nasync def run(args):\n    return id(LOADED)\n")
+    tool = make_tool("counter", "counter.py")
+
+    first = await service.execute_local_tool(tool, {})
+    second = await service.execute_local_tool(tool, {})
+    assert first.status == ExecutionStatus.SUCCESS
+    assert first.data == second.data
+
+    script.write_text("async def run(args):\n    return 'v2'\n")
+    stat = script.stat()
+    os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert (await service.execute_local_tool(tool, {})).data == "v2"
+
+@pytest.mark.asyncio
+async def test_sync_entrypoint_runs_off_the_event_loop(tool_service_factory, tmp_path):
+    service = tool_service_factory()
+    (tmp_path / "sync_tool.py").write_text("import threading\ndef run(args):\n    return threading.current_thread().name\n")
+
+    response = await service.execute_local_tool(make_tool("sync_tool", "sync_tool.py"), {})
+
+    assert response.status == ExecutionStatus.SUCCESS
+    assert response.data.startswith("local-tool")
+    assert response.data != threading.current_thread().name
+
+@pytest.mark.asyncio
+async def test_missing_script_is_reported(tool_service_factory):
+    service = tool_service_factory()
+    response = await service.execute_local_tool(make_tool("missing", "missing.py"), {})
+    assert response.status == ExecutionStatus.ERROR
+    assert "Script not found" in response.message
+
+@pytest.mark.asyncio
+async def test_context_entrypoint_gets_shared_http_client(tool_service_factory, tmp_path):
+    service = tool_service_factory()
+    (tmp_path / "net.py").write_text("async def run(args, context):\n    return id(context.http)\n")
+    (tmp_path / "plain.py").write_text("async def run(args):\n    return 'ok'\n")
+    tool = make_tool("net", "net.py")
+    tool.config["http"] = {"timeout": {"connect": 1, "read": 2}, "max_connections": 3}
+
+    first = await service.execute_local_tool(tool, {})
+    second = await service.execute_local_tool(tool, {})
+    assert first.status == ExecutionStatus.SUCCESS and first.data == second.data
+    assert (await service.execute_local_tool(make_tool("plain", "plain.py"), {})).data == "ok"
+
+@pytest.mark.asyncio
+async def test_open_breaker_returns_error_without_running_the_tool(tool_service_factory, tmp_path):
+    service = tool_service_factory()
+    (tmp_path / "boom.py").write_text("CALLS = []\nasync def run(args):\n    CALLS.append(1)\n    raise RuntimeError('down')\n")
+    tool = make_tool("boom", "boom.py")
+    tool.breaker_failure_threshold = 2
+
+    for _ in range(2):
+        assert (await service.execute_local_tool(tool, {})).message == "down"
+    rejected = await service.execute_local_tool(tool, {})
+
+    assert rejected.status == ExecutionStatus.ERROR and "circuit open" in rejected.message
+    assert len(service._load_module("boom", tmp_path / "boom.py").CALLS) == 2
+    assert service.breaker_stats()["boom"]["state"] == "open"
+
+@pytest.mark.asyncio
+async def test_caller_errors_do_not_open_the_breaker(tool_service_factory, tmp_path):
+    service = tool_service_factory()
+    # Same shapes as code_execution: a snippet that raises vs. a sandbox that died
+    (tmp_path / "snippet.py").write_text(
+        "async def run(args):\n"
+        "    if args['code'] == '1/0':\n"
+        "        return {'status': 'error', 'error': 'division by zero', 'caller_error': True}\n"
+        "    if args['code'] == 'crash':\n"
+        "        return {'status': 'error', 'error': 'Sandbox worker died (killed by SIGKILL)'}\n"
+        "    return {'status': 'success', 'stdout': '4\\n'}\n"
+    )
+    tool = make_tool("snippet", "snippet.py")
+    tool.breaker_failure_threshold = 2
+
+    for _ in range(6):
+        assert (await service.execute_local_tool(tool, {"code": "1/0"})).data["error"] == "division by zero"
+    assert (await service.execute_local_tool(tool, {"code": "print(2+2)"})).data["stdout"] == "4\n"
+    assert service.breaker_stats()["snippet"]["state"] == "closed"
+
+    # Infrastructure failures still count
+    for _ in range(2):
+        await service.execute_local_tool(tool, {"code": "crash"})
+    assert "circuit open" in (await service.execute_local_tool(tool, {"code": "print(2+2)"})).message
@@ -0,0 +1,54 @@
+import json
+import os
+import pytest
+
+def write_tools(path, tools):
+    path.write_text(json.dumps({"tools": [
+        {"name": name, "description": description, "type": "local", "input_schema": {}, "config": {"script_path": f"{name}.py"}}
+        for name, description in tools.items()
+    ]}))
+    # Make sure the change is visible even on coarse mtime filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+@pytest.mark.asyncio
+async def test_snapshot_is_loaded_once_and_refreshed_incrementally(tool_service_factory, tmp_path, monkeypatch):
+    service = tool_service_factory()
+    write_tools(tmp_path / "tools.json", {"weather": "Weather forecast", "email": "Send an email"})
+
+    upserts = []
+    original = service.vector_store.aupsert_many
+    async def spy(ids, texts, attributes=None):
+        upserts.append(sorted(ids))
+        await original(ids, texts, attributes)
+    monkeypatch.setattr(service.vector_store, "aupsert_many", spy)
+
+    first = await service.ensure_registry()
+    assert await service.ensure_registry() is first
+    assert not await service.refresh_registry()
+    assert upserts == [["email", "weather"]]
+    with pytest.raises(TypeError):
+        first.tools["new"] = None
+
+    write_tools(tmp_path / "tools.json", {"weather": "Weather forecast", "email": "Send an email message", "maps": "Directions"})
+    assert await service.refresh_registry()
+    assert upserts[1:] == [["email", "maps"]]
+    assert service.snapshot.version == first.version + 1
+    assert set(first.tools) == {"weather", "email"}
+
+    write_tools(tmp_path / "tools.json", {"weather": "Weather forecast"})
+    assert await service.refresh_registry()
+    assert len(upserts) == 2
+    assert service.vector_store.skill_ids == ["weather"]
+
+@pytest.mark.asyncio
+async def test_broken_edit_keeps_last_good_snapshot(tool_service_factory, tmp_path):
+    service = tool_service_factory()
+    write_tools(tmp_path / "tools.json", {"weather": "Weather forecast"})
+    snapshot = await service.ensure_registry()
+
+    (tmp_path / "tools.json").write_text("{ broken")
+    with pytest.raises(ValueError):
+        await service.refresh_registry()
+    assert service.snapshot is snapshot
+    assert [tool.name for tool in await service.list_tools()] == ["weather"]
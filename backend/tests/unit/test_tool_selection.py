@@ -0,0 +1,48 @@
+import pytest
+
+TOOLS = {
+    "weather_forecast": "Get the weather forecast for a city",
+    "currency_convert": "Convert an amount between currencies",
+    "send_email": "Send an email message to a recipient",
+    "request_human_input": "Ask the human user for missing details",
+}
+
+def local_tools():
+    return [
+        {"name": name, "description": description, "type": "local", "input_schema": {}, "config": {"script_path": f"{name}.py"}}
+        for name, description in TOOLS.items()
+    ]
+
+@pytest.mark.asyncio
+async def test_top_k_tools_plus_pinned(tool_service_factory):
+    service = tool_service_factory(local_tools())
+    await service.load_registry()
+
+    selected = [tool.name for tool in await service.select_tools("weather forecast for Paris", top_k=1)]
+    assert selected == ["request_human_input", "weather_forecast"]
+    assert [tool.name for tool in service.get_langchain_tools(await service.select_tools("x", top_k=1))][0] == "request_human_input"
+
+@pytest.mark.asyncio
+async def test_falls_back_to_all_tools(tool_service_factory, monkeypatch):
+    service = tool_service_factory(local_tools())
+    await service.load_registry()
+
+    assert len(await service.select_tools("weather", top_k=0)) == len(TOOLS)
+    assert len(await service.select_tools("weather", top_k=3)) == len(TOOLS)
+
+    async def broken(query, top_k=3):
+        raise RuntimeError("index unavailable")
+    monkeypatch.setattr(service, "search_tools", broken)
+    assert len(await service.select_tools("weather", top_k=1)) == len(TOOLS)
+
+@pytest.mark.asyncio
+async def test_excluded_names_are_never_offered(tool_service_factory):
+    service = tool_service_factory(local_tools())
+    await service.load_registry()
+
+    # The execution service already prepends its own request_human_input builtin
+    selected = [tool.name for tool in await service.select_tools("ask the user", top_k=1, exclude=["request_human_input"])]
+    fallback = [tool.name for tool in await service.select_tools("ask the user", top_k=0, exclude=["request_human_input"])]
+
+    assert len(selected) == 1 and "request_human_input" not in selected
+    assert "request_human_input" not in fallback and len(fallback) == len(TOOLS) - 1
@@ -0,0 +1,103 @@
+import numpy as np
+from src.core import vector_index
+from src.core.vector_index import IndexConfig
+from src.core.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from src.core import embeddings as embeddings_module
+from src.core.vector_store import VectorStore
+
+SMALL = IndexConfig(hnsw_threshold=4, ivfpq_threshold=200, ivf_nlist=4, ivf_nprobe=4, pq_m=4, pq_nbits=4)
+
+def test_auto_policy_by_size():
+    assert vector_index.choose_index_type(SMALL, 3) == "flat"
+    assert vector_index.choose_index_type(SMALL, 4) == "hnsw"
+    assert vector_index.choose_index_type(SMALL, 200) == "ivfpq"
+    assert vector_index.choose_index_type(SMALL.with_type("flat"), 10_000) == "flat"
+
+def test_recall_report_against_flat_baseline():
+    vectors = np.random.default_rng(1).random((300, 16), dtype=np.float32)
+    report = vector_index.recall_report(vectors, SMALL, k=5, sample_size=20)
+
+    by_type = {row["index_type"]: row for row in report}
+    assert by_type["flat"]["recall@5"] == 1.0
+    assert by_type["hnsw"]["recall@5"] > 0.9
+    assert 0.0 < by_type["ivfpq"]["recall@5"] <= 1.0
+    assert "latency_ms_mean" in by_type["ivfpq"]
+
+def test_store_switches_backend_and_handles_hnsw_removal(tmp_path, monkeypatch):
+    def fake_embed_content(model, content, task_type, **kwargs):
+        texts = content if isinstance(content, list) else [content]
+        vectors = [[float(ord(text[0])), float(len(text)), 0.0, 1.0] for text in texts]
+        return {"embedding": vectors if isinstance(content, list) else vectors[0]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", fake_embed_content)
+    store = VectorStore(dimension=4, cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache(), index_config=SMALL)
+
+    store.upsert_many(["a", "b", "c"], ["a", "bb", "ccc"])
+    assert store.index_type == "flat"
+
+    store.upsert("d", "dddd")
+    assert store.index_type == "hnsw"
+
+    # HNSW cannot remove nodes: a replaced vector is tombstoned until compaction rebuilds the graph
+    store.upsert("a", "aaaaa")
+    assert store.index_type == "hnsw" and store.current.tombstones == {0}
+    assert store.search("aaaaa", top_k=1)[0][0] == "a"
+    store.compact()
+    assert store.index_type == "hnsw" and store.current.tombstones == frozenset()
+    assert store.search("aaaaa", top_k=1)[0][0] == "a"
+
+    # Shrinking below the HNSW threshold rebuilds as flat
+    store.remove("b")
+    assert store.index_type == "flat"
+    assert sorted(store.skill_ids) == ["a", "c", "d"]
+    assert store.search("aaaaa", top_k=1)[0][0] == "a"
+
+def test_compact_store_truncates_quantizes_and_reranks(tmp_path, monkeypatch):
+    rng = np.random.default_rng(7)
+    raw = {f"skill {i}": rng.standard_normal(64).astype(np.float32) for i in range(50)}
+
+    def fake_embed_content(model, content, task_type, **kwargs):
+        texts = content if isinstance(content, list) else [content]
+        vectors = [raw[text].tolist() for text in texts]
+        return {"embedding": vectors if isinstance(content, list) else vectors[0]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", fake_embed_content)
+    config = IndexConfig(index_type="flat", storage="int8", rerank_candidates=10)
+    store = VectorStore(dimension=16, cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache(), index_config=config)
+    store.upsert_many([str(i) for i in range(50)], list(raw))
+
+    assert vector_index.storage_of(store.index) == "int8"
+    assert np.allclose(np.linalg.norm(store.get_embedding("skill 3")), 1.0)
+    assert store.get_embedding("skill 3").shape == (16,)
+
+    results = store.search("skill 3", top_k=3)
+    assert results[0][0] == "3"
+    assert results[0][1] == 0.0  # exact re-rank distance, not the quantized one
+    assert [d for _, d in results] == sorted(d for _, d in results)
+
+def test_int8_storage_is_trained_on_the_data():
+    rng = np.random.default_rng(3)
+    centers = rng.standard_normal((20, 256)).astype(np.float32)
+    vectors = centers[rng.integers(0, 20, 400)] + 0.3 * rng.standard_normal((400, 256)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    report = vector_index.recall_report(vectors, IndexConfig(storage="int8"), k=10, sample_size=50, index_types=["flat"])
+    assert report[0]["recall@10"] > 0.97
+
+def test_int8_store_retrains_as_the_collection_grows(tmp_path, monkeypatch):
+    def fake_embed_content(model, content, task_type, **kwargs):
+        return {"embedding": [[float(len(text)), 1.0, 0.0, 0.5] for text in content]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", fake_embed_content)
+    config = IndexConfig(index_type="flat", storage="int8")
+    store = VectorStore(dimension=4, cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache(), index_config=config)
+
+    # The first vectors replace the placeholder unit-range training
+    store.upsert_many(["a", "b"], ["x", "yy"])
+    assert store.current.trained_size == 2
+
+    store.upsert_many(["c", "d", "e"], ["zzz", "wwww", "vvvvv"])
+    assert store.current.trained_size == 2
+    store.upsert_many([f"s{i}" for i in range(5)], ["u" * (6 + i) for i in range(5)])
+    assert store.current.trained_size == 10
+    assert store.search("yy", top_k=1)[0][0] == "b"
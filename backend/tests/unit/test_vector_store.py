@@ -0,0 +1,311 @@
+import pytest
+from src.core.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from src.core import embeddings as embeddings_module
+from src.core.vector_store import VectorStore
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    calls = []
+
+    def fake_embed_content(model, content, task_type, **kwargs):
+        calls.append(content)
+        if isinstance(content, list):
+            return {"embedding": [[float(len(text)), 1.0, 0.0, 0.0] for text in content]}
+        return {"embedding": [float(len(content)), 1.0, 0.0, 0.0]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", fake_embed_content)
+    return calls
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, embed_calls):
+    monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "2")
+    return VectorStore(dimension=4, cache=EmbeddingCache(cache_dir=str(tmp_path)), query_cache=QueryEmbeddingCache())
+
+def test_add_many_batches_and_dedupes(store, embed_calls):
+    store.add_many(["a", "b", "c", "d", "e"], ["x", "yy", "x", "zzz", "wwww"])
+
+    # 4 unique texts with batch size 2 -> 2 remote calls
+    assert embed_calls == [["x", "yy"], ["zzz", "wwww"]]
+    assert store.index.ntotal == 5
+    assert store.skill_ids == ["a", "b", "c", "d", "e"]
+    assert store.search("zzz", top_k=1)[0][0] == "d"
+
+def test_add_many_rejects_mismatched_lengths(store):
+    with pytest.raises(ValueError):
+        store.add_many(["a"], [])
+
+def test_upsert_replaces_existing_vector(store):
+    store.upsert("a", "x")
+    store.upsert("a", "yyyy")
+
+    assert store.index.ntotal == 1
+    assert store.skill_ids == ["a"]
+    assert store.search("yyyy", top_k=5) == [("a", 0.0)]
+
+def test_remove_makes_no_remote_calls(store, embed_calls):
+    store.upsert_many(["a", "b"], ["x", "yy"])
+    embed_calls.clear()
+
+    assert store.remove("a") is True
+    assert store.remove("missing") is False
+    assert embed_calls == []
+    assert store.size == 1
+    assert "a" not in store
+    assert store.search("yy", top_k=5)[0][0] == "b"
+
+def test_snapshot_roundtrip_is_memory_mapped(store, tmp_path, embed_calls):
+    store.upsert_many(["a", "b"], ["x", "yy"])
+    store.save_snapshot(tmp_path / "snap", version="v1")
+
+    restored = VectorStore(dimension=4, cache=store.cache)
+    assert restored.load_snapshot(tmp_path / "snap", version="v2") is False
+    assert restored.load_snapshot(tmp_path / "snap", version="v1") is True
+    assert restored.skill_ids == ["a", "b"]
+    assert restored.current.mmapped is True
+
+    # Incremental writes leave the mapped main index alone; compaction copies it into memory
+    restored.upsert("c", "zzz")
+    restored.remove("a")
+    assert restored.current.mmapped is True
+    assert sorted(restored.skill_ids) == ["b", "c"]
+    assert restored.search("zzz", top_k=1)[0][0] == "c"
+
+    restored.compact()
+    assert restored.current.mmapped is False
+    assert restored.index.ntotal == 2 and restored.current.tombstones == frozenset()
+    assert [skill_id for skill_id, _ in restored.search("zzz", top_k=5)] == ["c", "b"]
+
+def test_incremental_writes_use_delta_and_tombstones(store, monkeypatch):
+    store.delta_max_size = 4
+    store.upsert_many(["a", "b", "c", "d"], ["x", "yy", "zzz", "wwww"])
+    copies = []
+    original_copy = store._copy_index
+    monkeypatch.setattr(store, "_copy_index", lambda index: copies.append(index) or original_copy(index))
+    main = store.index
+
+    store.upsert("a", "vvvvv")
+    store.remove("b")
+    store.upsert("e", "uuuuuu")
+    assert copies == [] and store.index is main
+    assert store.current.tombstones == {0, 1} and store.current.delta_labels.tolist() == [4, 5]
+    assert [skill_id for skill_id, _ in store.search("yy", top_k=5)] == ["c", "d", "a", "e"]
+
+    # A fifth pending change crosses delta_max_size and folds everything into a new main index
+    store.upsert("f", "ttttttt")
+    assert len(copies) == 1
+    assert store.index.ntotal == 5 and store.current.tombstones == frozenset() and store.current.delta is None
+    assert sorted(store.skill_ids) == ["a", "c", "d", "e", "f"]
+
+def test_snapshot_keeps_main_index_file_across_incremental_saves(store, tmp_path):
+    store.upsert_many(["a", "b", "c"], ["x", "yy", "zzz"])
+    store.save_snapshot(tmp_path, version="v1")
+    index_files = list(tmp_path.glob("skill_index.*.faiss"))
+
+    store.remove("a")
+    store.upsert("d", "wwww", {"tag": ["pdf"]})
+    store.save_snapshot(tmp_path, version="v2")
+    assert list(tmp_path.glob("skill_index.*.faiss")) == index_files
+    assert len(list(tmp_path.glob("skill_index.*.delta.npz"))) == 1
+
+    restored = VectorStore(dimension=4, cache=store.cache)
+    assert restored.load_snapshot(tmp_path, version="v2") is True
+    assert sorted(restored.skill_ids) == ["b", "c", "d"]
+    assert restored.search("x", top_k=5, filters={"tag": ["pdf"]}) == [("d", 9.0)]
+    assert [skill_id for skill_id, _ in restored.search("x", top_k=5)] == ["b", "c", "d"]
+
+def test_snapshot_replaces_previous_version_files(store, tmp_path):
+    store.upsert("a", "x")
+    store.save_snapshot(tmp_path, version="v1")
+    store.upsert("b", "yy")
+    store.save_snapshot(tmp_path, version="v2")
+
+    assert len(list(tmp_path.glob("skill_index.*.faiss"))) == 1
+
+def test_snapshot_skipped_while_embeddings_failed(store, tmp_path, monkeypatch):
+    def failing_embed_content(model, content, task_type, **kwargs):
+        raise RuntimeError("service down")
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", failing_embed_content)
+    store.upsert("a", "x")
+
+    assert store.save_snapshot(tmp_path, version="v1") is False
+    assert not (tmp_path / "skill_index.meta.json").exists()
+
+def test_search_backs_off_when_embedding_service_fails(store, monkeypatch):
+    store.upsert("a", "x")
+    calls = []
+
+    def failing_embed_content(model, content, task_type, **kwargs):
+        calls.append(content)
+        raise TimeoutError("deadline exceeded")
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", failing_embed_content)
+
+    assert store.search("anything") == []
+    assert store.search("something else") == []
+    # The second search is served inside the back-off window without a network call
+    assert calls == [["anything"]]
+    assert store.embeddings_available() is False
+
+@pytest.mark.asyncio
+async def test_async_upsert_does_not_block_event_loop(store, monkeypatch):
+    import asyncio
+    import time
+
+    def slow_embed_content(model, content, task_type, **kwargs):
+        time.sleep(0.2)
+        return {"embedding": [[float(len(text)), 1.0, 0.0, 0.0] for text in content]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", slow_embed_content)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await store.aupsert_many(["a", "b"], ["x", "yy"])
+    task.cancel()
+
+    assert ticks >= 5
+    assert sorted(store.skill_ids) == ["a", "b"]
+    assert (await store.asearch("yy", top_k=1))[0][0] == "b"
+
+@pytest.mark.asyncio
+async def test_async_embedding_retries_with_backoff(store, monkeypatch):
+    attempts = []
+
+    def flaky_embed_content(model, content, task_type, **kwargs):
+        attempts.append(content)
+        if len(attempts) < 3:
+            raise ConnectionError("transient")
+        return {"embedding": [[1.0, 0.0, 0.0, 0.0] for _ in content]}
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", flaky_embed_content)
+    store.retry_backoff = 0.001
+
+    await store.aupsert("a", "x")
+    assert len(attempts) == 3
+    assert store.current.degraded_ids == set()
+
+def test_search_many_embeds_queries_together(store, embed_calls):
+    store.upsert_many(["a", "b", "c"], ["x", "yy", "zzz"])
+    embed_calls.clear()
+
+    results = store.search_many(["zzz", "x", "zzz", "yy"], top_k=2)
+
+    # Unique queries in batches of 2, then one matrix search
+    assert embed_calls == [["zzz", "x"], ["yy"]]
+    assert [hits[0][0] for hits in results] == ["c", "a", "c", "b"]
+    assert all(len(hits) == 2 for hits in results)
+    assert store.search_many([], top_k=1) == []
+
+@pytest.mark.asyncio
+async def test_async_search_many_skips_failed_queries(store, monkeypatch):
+    store.upsert("a", "x")
+
+    def failing_embed_content(model, content, task_type, **kwargs):
+        raise TimeoutError("deadline exceeded")
+
+    monkeypatch.setattr(embeddings_module.genai, "embed_content", failing_embed_content)
+    assert await store.asearch_many(["q1", "q2"], top_k=1) == [[], []]
+
+def test_replace_all_publishes_new_generation_atomically(store, embed_calls, monkeypatch):
+    store.upsert_many(["a", "b"], ["x", "yy"])
+    store.search("yy", top_k=1)
+    before = store.current
+    seen_during_reindex = []
+    original_embed = store.provider.embed
+
+    def observing_embed(texts, task_type, timeout=None):
+        # Runs mid re-index: readers must still see the complete previous generation
+        seen_during_reindex.append((store.generation, store.index.ntotal, store.search("yy", top_k=1)))
+        return original_embed(texts, task_type, timeout)
+
+    monkeypatch.setattr(store.provider, "embed", observing_embed)
+    store.replace_all(["c", "d"], ["zzz", "wwww"])
+
+    assert seen_during_reindex[0][:2] == (before.number, 2)
+    assert seen_during_reindex[0][2][0][0] == "b"
+    assert store.generation == before.number + 1
+    assert store.skill_ids == ["c", "d"]
+    # The old generation is untouched and still usable by readers holding it
+    assert before.index.ntotal == 2 and set(before.label_by_id) == {"a", "b"}
+
+def test_filtered_search_applies_bitmaps_inside_index(store):
+    store.upsert_many(
+        ["a", "b", "c"],
+        ["x", "yy", "zzz"],
+        [{"complexity": ["SIMPLE"], "tag": ["pdf"]}, {"complexity": ["COMPLEX"], "tag": ["pdf", "ocr"]}, {"complexity": ["SIMPLE"], "tag": []}],
+    )
+
+    assert store.search("zzz", top_k=3, filters={"tag": ["pdf"]}) == [("b", 1.0), ("a", 4.0)]
+    assert [skill_id for skill_id, _ in store.search("x", top_k=3, filters={"complexity": ["SIMPLE"]})] == ["a", "c"]
+    assert store.search("x", top_k=3, filters={"tag": ["pdf", "ocr"]})[0][0] == "b"
+    assert store.search("x", top_k=3, filters={"tag": ["missing"]}) == []
+
+    # Bitmaps follow the generation: replaced and removed skills drop out
+    store.upsert("b", "yy", {"complexity": ["SIMPLE"]})
+    store.remove("a")
+    assert store.search("x", top_k=3, filters={"tag": ["pdf"]}) == []
+    assert [skill_id for skill_id, _ in store.search("x", top_k=3, filters={"complexity": ["SIMPLE"]})] == ["b", "c"]
+
+def test_snapshot_of_another_format_is_rebuilt(store, tmp_path):
+    import json
+
+    store.upsert_many(["a", "b"], ["x", "yy"], [{"tag": ["pdf"]}, {}])
+    store.save_snapshot(tmp_path, version="v1")
+    meta_path = tmp_path / "skill_index.meta.json"
+    meta = json.loads(meta_path.read_text())
+
+    # A snapshot from before attributes were persisted would silently disable every filter
+    legacy = {key: value for key, value in meta.items() if key not in ("format", "attributes")}
+    meta_path.write_text(json.dumps(legacy))
+    assert VectorStore(dimension=4, cache=store.cache).load_snapshot(tmp_path, version="v1") is False
+
+    meta_path.write_text(json.dumps({key: value for key, value in meta.items() if key != "attributes"}))
+    assert VectorStore(dimension=4, cache=store.cache).load_snapshot(tmp_path, version="v1") is False
+
+    meta_path.write_text(json.dumps(meta))
+    restored = VectorStore(dimension=4, cache=store.cache)
+    assert restored.load_snapshot(tmp_path, version="v1") is True
+    assert restored.search("x", top_k=5, filters={"tag": ["pdf"]})[0][0] == "a"
+
+@pytest.mark.asyncio
+async def test_async_upsert_rebuild_makes_no_blocking_embedding_calls(store, monkeypatch):
+    from src.core.vector_index import IndexConfig
+
+    store.index_config = IndexConfig(hnsw_threshold=4)
+    store.upsert_many(["a", "b", "c"], ["x", "yy", "zzz"])
+    # Vectors missing from the cache are re-embedded by the rebuild; that must go through the async path too
+    store.cache._memory.clear()
+    for path in store.cache.cache_dir.rglob("*.npy"):
+        path.unlink()
+
+    def blocking_get_embeddings(*args, **kwargs):
+        raise AssertionError("rebuild called the blocking get_embeddings")
+
+    monkeypatch.setattr(store, "get_embeddings", blocking_get_embeddings)
+    await store.aupsert("d", "wwww")
+
+    assert store.index_type == "hnsw"
+    assert sorted(store.skill_ids) == ["a", "b", "c", "d"]
+    assert (await store.asearch("zzz", top_k=1))[0][0] == "c"
+
+@pytest.mark.asyncio
+async def test_async_remove_many_publishes_once_off_the_event_loop(store, monkeypatch):
+    import threading
+
+    store.upsert_many(["a", "b", "c", "d"], ["x", "yy", "zzz", "wwww"])
+    before = store.generation
+    threads = []
+    original = store.remove_many
+    monkeypatch.setattr(store, "remove_many", lambda ids: threads.append(threading.current_thread()) or original(ids))
+
+    assert await store.aremove_many(["a", "c", "missing", "a"]) == 2
+    assert threads[0] is not threading.main_thread()
+    assert store.generation == before + 1
+    assert sorted(store.skill_ids) == ["b", "d"]
+    assert [skill_id for skill_id, _ in store.search("x", top_k=5)] == ["b", "d"]